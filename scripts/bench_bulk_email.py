@@ -0,0 +1,36 @@
+"""Per-message cost of the bulk emails, against one-by-one construction.
+
+    python scripts/bench_bulk_email.py [recipients]
+"""
+
+import sys
+import time
+from uvcreha.emailer import SecureMailer
+
+
+TEXT = "Sehr geehrte Damen und Herren,\n\n" + "Lorem ipsum dolor sit amet. " * 200
+HTML = "<p>" + TEXT.replace("\n", "<br />") + "</p>"
+
+
+def bench(label, build, count):
+    start = time.perf_counter()
+    for msg in build():
+        msg.as_bytes()  # as serialized for sending or spooling.
+    elapsed = time.perf_counter() - start
+    print(f"{label:<12} {elapsed * 1e6 / count:>10.1f} µs/message")
+    return elapsed
+
+
+def main(count=2000):
+    mailer = SecureMailer(user="", password="", emitter="web@web.de")
+    recipients = [f"user{n}@example.com" for n in range(count)]
+    single = bench("one by one", lambda: (
+        mailer.email(recipient, "Benachrichtigung", TEXT, HTML)
+        for recipient in recipients), count)
+    bulk = bench("bulk", lambda: mailer.bulk_email(
+        recipients, "Benachrichtigung", TEXT, HTML), count)
+    print(f"speedup      {single / bulk:>10.1f}x")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -30,6 +30,7 @@ install_requires = [
 
 test_requires = [
     'WebTest',
+    'aiosmtpd',
     'frozendict',
     'horsebox',
     'pyhamcrest',
@@ -66,6 +67,7 @@ setup(
     tests_require=test_requires,
     extras_require={
         'test': test_requires,
+        'brotli': ['brotli'],
     },
     entry_points={
         "pytest11": [
@@ -74,5 +76,8 @@ setup(
         "fanstatic.libraries": [
             "uvcreha = uvcreha.browser.resources:library",
         ],
+        "console_scripts": [
+            "uvcreha-templates = uvcreha.browser.warmup:main",
+        ],
     }
 )
@@ -1,40 +1,53 @@
 from horseman.types import Environ, WSGICallable
 from horseman.response import Response
 from uvcreha import contenttypes
-from typing import Any, Callable, Optional, Iterable
+from typing import Any, Callable, Optional, Iterable, Tuple
 
 
 Filter = Callable[[Environ, WSGICallable, Any], Optional[Response]]
+Dispatcher = Callable[[str], Tuple[Filter, ...]]
+
+
+# Loginname or email, in one indexed lookup.
+# Loginname matches are preferred, as they used to be checked first.
+CREDENTIALS_QUERY = """
+FOR user IN @@collection
+  FILTER (user.loginname == @login OR user.email == @login)
+    AND user.password == @password
+  SORT user.loginname == @login DESC
+  LIMIT 1
+  RETURN user
+"""
 
 
 class Auth:
 
-    __slots__ = ("connector", "user_key", "session_key", "filters")
+    __slots__ = ("connector", "user_key", "session_key", "filters", "cache")
 
     filters: Iterable[Filter]
 
-    def __init__(self, connector, user_key, session_key, filters=None):
+    def __init__(self, connector, user_key, session_key,
+                 filters=None, cache=None):
         self.connector = connector
         self.user_key = user_key
         self.session_key = session_key
         if filters is None:
             filters = []
         self.filters = filters
+        self.cache = cache  # Optional `uvcreha.auth.cache.IdentityCache`
 
     def from_credentials(self, credentials: dict):
         db = self.connector.get_database()
-        binding = contenttypes.registry["user"].bind(db)
+        ct = contenttypes.registry["user"]
         # We use either loginname or email
-        user = binding.find_one(
-            loginname=credentials["loginname"],
-            password=credentials["password"]
-        )
-        if user is not None:
-            return user
-        return binding.find_one(
-            email=credentials["loginname"],
-            password=credentials["password"]
-        )
+        cursor = db.aql.execute(CREDENTIALS_QUERY, bind_vars={
+            "@collection": ct.collection,
+            "login": credentials["loginname"],
+            "password": credentials["password"],
+        })
+        if (document := next(cursor, None)) is not None:
+            return ct.factory(**document)
+        return None
 
     def identify(self, environ: Environ):
         if (user := environ.get(self.user_key)) is not None:
@@ -43,9 +56,17 @@ class Auth:
         session = environ.get(self.session_key)
         if session is not None:
             if (user_key := session.get(self.user_key, None)) is not None:
-                db = self.connector.get_database()
-                binding = contenttypes.registry["user"].bind(db)
-                user = environ[self.user_key] = binding.fetch(user_key)
+                if self.cache is not None:
+                    if (document := self.cache.get(user_key)) is not None:
+                        user = contenttypes.registry["user"].factory(
+                            **document)
+                if user is None:
+                    db = self.connector.get_database()
+                    binding = contenttypes.registry["user"].bind(db)
+                    user = binding.fetch(user_key)
+                    if user is not None and self.cache is not None:
+                        self.cache.set(user_key, user)
+                environ[self.user_key] = user
                 return user
 
         return None
@@ -58,13 +79,46 @@ class Auth:
         session = environ[self.session_key]
         session[self.user_key] = user["uid"]
         environ[self.user_key] = user
+        if self.cache is not None:
+            self.cache.set(user["uid"], user)
+
+    def compile_filters(self) -> Dispatcher:
+        """Returns a dispatcher giving the filters to run for a path.
+        A filter bypassing a path lets the request through on that path:
+        the chain is cut right before the first bypassing filter.
+        """
+        default = tuple(self.filters)
+        exact = {}
+        prefixes = []
+        for index, filter in enumerate(default):
+            for path in getattr(filter, "bypass", ()):
+                exact.setdefault(path, default[:index])
+            for prefix in getattr(filter, "bypass_prefixes", ()):
+                prefixes.append((prefix, default[:index]))
+        starts = tuple(prefix for prefix, _ in prefixes)
+
+        def dispatch(path: str) -> Tuple[Filter, ...]:
+            chain = exact.get(path, default)
+            if starts and path.startswith(starts):
+                for prefix, prefixed in prefixes:
+                    if len(prefixed) >= len(chain):
+                        break  # Prefixes are in filters order.
+                    if path.startswith(prefix):
+                        return prefixed
+            return chain
+
+        return dispatch
 
     def __call__(self, app):
+        dispatch = self.compile_filters()
+
         def auth_application_wrapper(environ, start_response):
-            user = self.identify(environ)
-            for filter in self.filters:
-                if (response := filter(environ, app, user)) is not None:
-                    return response(environ, start_response)
+            if chain := dispatch(environ["PATH_INFO"]):
+                user = self.identify(environ)
+                for filter in chain:
+                    if (response := filter(environ, app, user)) is not None:
+                        return response(environ, start_response)
+            # Empty chain: the path is not protected, no identification.
             return app(environ, start_response)
 
         return auth_application_wrapper
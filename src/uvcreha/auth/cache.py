@@ -0,0 +1,82 @@
+import time
+import orjson
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Mapping, Optional
+from weakref import WeakSet
+from uvcreha import contenttypes
+from uvcreha.app import events
+from uvcreha.events import ObjectModifiedEvent
+
+
+class IdentityCache:
+    """Process-wide LRU cache of the user documents, keyed by uid.
+    Documents are kept serialized: each `get` returns a new copy, so
+    concurrent requests never share a mutable user.
+
+    Entries expire after `ttl` seconds and are invalidated once the
+    modified user is written, on `ObjectModifiedEvent`. Not on workflow
+    transitions: they happen before the new state is saved, a request
+    could refill the cache with the previous one meanwhile.
+    The invalidations only reach the current process: with several
+    workers, the others keep a deactivated or closed user for up to
+    `ttl` seconds. Keep it short for such deployments.
+    """
+
+    __slots__ = ("maxsize", "ttl", "_entries", "_lock", "__weakref__")
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 30):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        caches.add(self)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, uid: str):
+        return self.get(uid) is not None
+
+    def get(self, uid: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(uid)
+            if entry is None:
+                return None
+            expires, document = entry
+            if expires < time.monotonic():
+                del self._entries[uid]
+                return None
+            self._entries.move_to_end(uid)
+        return orjson.loads(document)
+
+    def set(self, uid: str, user: Mapping[str, Any]):
+        document = orjson.dumps(dict(user))
+        with self._lock:
+            self._entries[uid] = (time.monotonic() + self.ttl, document)
+            self._entries.move_to_end(uid)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, uid: str):
+        with self._lock:
+            self._entries.pop(uid, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+caches: WeakSet = WeakSet()
+
+
+def invalidate_user(uid: str):
+    for cache in caches:
+        cache.invalidate(uid)
+
+
+@events.subscribe(ObjectModifiedEvent)
+def user_modified(event):
+    # Notified after the user was written, state transitions included.
+    if isinstance(event.obj, contenttypes.registry["user"].factory):
+        invalidate_user(event.obj["uid"])
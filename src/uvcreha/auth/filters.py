@@ -1,17 +1,27 @@
-from typing import List
+from typing import List, Iterable
 from uvcreha.auth import Filter
+from uvcreha.workflow import user_workflow
 from horseman.response import Response
 from roughrider.workflow import WorkflowState
 
 
-def security_bypass(urls: List[str]) -> Filter:
+# Filters may declare the paths they let through unconditionally,
+# using the `bypass` (exact paths) and `bypass_prefixes` attributes.
+# `uvcreha.auth.Auth` uses them to compile the filters chain per path.
+
+
+def security_bypass(urls: List[str], prefixes: Iterable[str] = ()) -> Filter:
     unprotected = frozenset(urls)
+    prefixes = tuple(prefixes)
 
     def _filter(environ, caller, user):
-        if environ["PATH_INFO"] in unprotected:
+        path = environ["PATH_INFO"]
+        if path in unprotected or path.startswith(prefixes):
             return caller
         return None  # Continue the chain
 
+    _filter.bypass = unprotected
+    _filter.bypass_prefixes = prefixes
     return _filter
 
 
@@ -28,7 +38,8 @@ def filter_user_state(states: List[WorkflowState]) -> Filter:
     forbidden_states = frozenset(states)
 
     def _filter(environ, caller, user):
-        if user.state in forbidden_states:
+        # Reading the state doesn't require a workflow item wrapper.
+        if user_workflow.get(user.get("state")) in forbidden_states:
             return Response.create(403)
         return None  # Continue the chain
 
@@ -39,19 +50,24 @@ def user_register(state: WorkflowState, path: str) -> Filter:
     def _filter(environ, caller, user):
         if environ["PATH_INFO"] == path:
             return caller
-        if user.state is state:
+        if user_workflow.get(user.get("state")) is state:
             return Response.redirect(environ["SCRIPT_NAME"] + path)
         return None  # Continue the chain
 
+    _filter.bypass = frozenset((path,))
     return _filter
 
 
 def TwoFA(path: str) -> Filter:
+    # The form and its QR code image.
+    bypass = frozenset((path, path + "/qrcode.png"))
+
     def _filter(environ, caller, user):
-        if environ["PATH_INFO"] == path:
+        if environ["PATH_INFO"] in bypass:
             return caller
         if not caller.utilities["twoFA"].check_twoFA(environ):
             return Response.redirect(environ["SCRIPT_NAME"] + path)
         return None  # Continue the chain
 
+    _filter.bypass = bypass
     return _filter
@@ -0,0 +1,83 @@
+import os
+import qrcode
+import threading
+from collections import Counter, OrderedDict
+from hashlib import sha256
+from io import BytesIO
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+
+class QRImage(NamedTuple):
+    digest: str  # sha256 hex digest of the encoded data
+    png: bytes
+
+
+def render_png(data: str) -> bytes:
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        box_size=10,
+        border=4,
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+    img = qr.make_image(fill="black", back_color="white")
+    buffer = BytesIO()
+    img.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class QRCodes:
+    """PNG QR codes, rendered once per encoded data.
+    Images are kept in a memory LRU and, if a `folder` is given, on disk.
+    The OTP provisioning URIs hold the users' secrets: the folder must
+    not be readable by others. Images are written with 0600 permissions.
+    """
+
+    __slots__ = ("maxsize", "folder", "stats", "_images", "_lock")
+
+    def __init__(self, maxsize: int = 256, folder: Optional[Path] = None):
+        self.maxsize = maxsize
+        self.folder = folder
+        if folder is not None:
+            self.folder = Path(folder)
+            self.folder.mkdir(mode=0o700, parents=True, exist_ok=True)
+        self.stats = Counter(hits=0, disk=0, rendered=0)
+        self._images = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._images)
+
+    def _remember(self, image: QRImage):
+        with self._lock:
+            self._images[image.digest] = image
+            self._images.move_to_end(image.digest)
+            while len(self._images) > self.maxsize:
+                self._images.popitem(last=False)
+
+    def get(self, data: str) -> QRImage:
+        digest = sha256(data.encode("utf-8")).hexdigest()
+        with self._lock:
+            if (image := self._images.get(digest)) is not None:
+                self._images.move_to_end(digest)
+                self.stats["hits"] += 1
+                return image
+
+        path = self.folder / f"{digest}.png" if self.folder else None
+        if path is not None and path.exists():
+            image = QRImage(digest, path.read_bytes())
+            self.stats["disk"] += 1
+        else:
+            image = QRImage(digest, render_png(data))
+            self.stats["rendered"] += 1
+            if path is not None:
+                fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+                with os.fdopen(fd, "wb") as fp:
+                    fp.write(image.png)
+        self._remember(image)
+        return image
+
+
+qrcodes = QRCodes()  # default, when no 'qrcodes' utility is configured.
@@ -6,10 +6,11 @@ from reiter.application.registries import NamedComponents
 from uvcreha.app import browser
 from uvcreha.browser.views import View
 from uvcreha.browser.layout import TEMPLATES
-from uvcreha.browser.form import Form, FormView
-from uvcreha import contenttypes, jsonschema
+from uvcreha.browser.form import Form, FormView, schema_fields_for
+from uvcreha import contenttypes
+from uvcreha.models.document import ITEM_SCHEMA_VERSION
+from uvcreha.jsonschema import store
 from uvcreha.workflow import document_workflow
-from jsonschema_wtforms import schema_fields
 
 
 @browser.register("/users/{uid}/files/{az}/docs/{docid}", name="doc.view")
@@ -18,7 +19,7 @@ class DocumentIndex(View):
 
     def update(self):
         ct = contenttypes.registry["document"]
-        self.context = ct.bind(self.request.database).find_one(**self.params)
+        self.context = self.request.contents.find_one(ct, **self.params)
 
     def GET(self):
         if self.context.state is document_workflow.states.inquiry:
@@ -41,10 +42,10 @@ DocumentEdit = NamedComponents()
     name="doc.edit")
 def document_edit_dispatch(request, **params):
     content_type = contenttypes.registry['document']
-    context = content_type.bind(request.database).find_one(**params)
+    context = request.contents.find_one(content_type, **params)
     form = DocumentEdit.get(context["content_type"], DefaultDocumentEditForm)
     form.content_type = content_type
-    form.context = content_type.bind(request.database).find_one(**params)
+    form.context = context
     return form(request, **params)()
 
 
@@ -55,9 +56,20 @@ class DefaultDocumentEditForm(FormView):
     content_type = None
     context = None
 
+    @property
+    def schema_version(self):
+        # The item is edited with the schema version it was created with.
+        # A new item is bound to the current version.
+        name = self.context['content_type']
+        version = store.known_version(
+            name, self.context.get(ITEM_SCHEMA_VERSION))
+        if version is None:
+            version = store.lookup(name).number
+        return version
+
     def get_fields(self):
-        schema = jsonschema.store.get(self.context['content_type'])
-        return schema_fields(schema)
+        return schema_fields_for(
+            self.context['content_type'], version=self.schema_version)
 
     def setupForm(self, formdata=Multidict()):
         fields = self.get_fields()
@@ -80,7 +92,8 @@ class DefaultDocumentEditForm(FormView):
         response = doc.update(
             request.route.params['docid'],
             item=data.dict(),
-            state=self.context.state.name
+            state=self.context.state.name,
+            **{ITEM_SCHEMA_VERSION: self.schema_version}
         )
         return self.redirect("/")
 
@@ -8,11 +8,12 @@ from uvcreha.browser.views import View
 @browser.register("/users/{uid}/files/{az}", name="file.view")
 class FileIndex(View):
     template = TEMPLATES["file_view.pt"]
+    stream = True
 
     def GET(self):
         file_ct = contenttypes.registry["file"]
         doc_ct = contenttypes.registry["document"]
-        file = file_ct.bind(self.request.database).find_one(**self.params)
+        file = self.request.contents.find_one(file_ct, **self.params)
         docs = doc_ct.bind(self.request.database).find(
             uid=file.data["uid"], az=file.data["az"]
         )
@@ -1,17 +1,44 @@
 import wtforms
 import reiter.form
 from abc import ABC, abstractmethod
+from typing import Dict, Iterable, Optional, Tuple
 from horseman.http import Multidict, HTTPError
 from wtforms import widgets, SelectMultipleField
 from wtforms_components import read_only
 from wtforms.fields.simple import MultipleFileField
-from jsonschema_wtforms import Form as JSONForm
+from jsonschema_wtforms import Form as JSONForm, schema_fields
 from uvcreha import jsonschema
 from uvcreha.browser.layout import TEMPLATES
 from uvcreha.browser.resources import f_input_group
 from uvcreha.browser.views import layout_rendering
 
 
+# (schema name, version, include, exclude) -> (store revision, fields)
+_schema_fields: Dict[Tuple, Tuple[int, Dict]] = {}
+
+
+def schema_fields_for(name: str,
+                      include: Optional[Iterable[str]] = None,
+                      exclude: Optional[Iterable[str]] = None,
+                      version: Optional[int] = None) -> Dict:
+    """Fields of the stored JSON schema `name`, generated once and
+    regenerated only when the schemas store changes.
+    Without a `version`, the latest version of the schema is used.
+    A new dict is returned: it can be safely altered.
+    """
+    include = tuple(include) if include is not None else None
+    exclude = tuple(exclude) if exclude is not None else None
+    key = (name, version, include, exclude)
+    revision = jsonschema.store.revision
+    cached = _schema_fields.get(key)
+    if cached is None or cached[0] != revision:
+        fields = schema_fields(
+            jsonschema.store.resolve(name, version).dict(),
+            include=include, exclude=exclude)
+        cached = _schema_fields[key] = (revision, fields)
+    return dict(cached[1])
+
+
 class MultiCheckboxField(SelectMultipleField):
     widget = widgets.ListWidget(prefix_label=False)
     option_widget = widgets.CheckboxInput()
@@ -0,0 +1,128 @@
+import time
+import threading
+from collections import Counter, OrderedDict
+from functools import wraps
+from typing import Callable, Dict, Hashable, Optional, Tuple
+from uvcreha import contenttypes
+from uvcreha.app import events
+from uvcreha.events import ObjectModifiedEvent
+
+
+def anonymous(request) -> bool:
+    return request.user is None
+
+
+def user(request) -> Optional[str]:
+    if (current := request.user) is not None:
+        return current["uid"]
+    return None
+
+
+def permissions(request) -> frozenset:
+    if (current := request.user) is not None:
+        return frozenset(current.get("permissions") or ())
+    return frozenset()
+
+
+def language(request) -> str:
+    header = request.environ.get("HTTP_ACCEPT_LANGUAGE", "")
+    return header.split(",", 1)[0].split(";", 1)[0].strip().lower()
+
+
+# Name of the vary key -> value computed from the request.
+VARY: Dict[str, Callable[..., Hashable]] = {
+    "anonymous": anonymous,
+    "user": user,
+    "permissions": permissions,
+    "language": language,
+}
+
+
+class FragmentCache:
+    """Size-bounded LRU of rendered fragments.
+    Entries are keyed by the slot name and the values of its vary keys.
+
+    Entries expire after `ttl` seconds. The invalidations only reach
+    the current process: with several workers, the others serve the
+    stale fragments for up to `ttl` seconds.
+    """
+
+    __slots__ = ("maxsize", "ttl", "stats", "_entries", "_lock")
+
+    def __init__(self, maxsize: int = 512, ttl: float = 30):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stats = Counter(hits=0, misses=0)
+        self._entries: Dict[Tuple, Tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: Tuple) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                del self._entries[key]  # expired.
+                entry = None
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry[1]
+
+    def set(self, key: Tuple, fragment: str):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, fragment)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, name: Optional[str] = None, **vary):
+        """Drops the fragments of the slot `name`, or of all the slots,
+        rendered for the given vary values, e.g. `user="uid"`.
+        """
+        with self._lock:
+            stale = [
+                key for key in self._entries
+                if (name is None or key[0] == name)
+                and all(
+                    dict(key[1]).get(vkey, ...) == value
+                    for vkey, value in vary.items())
+            ]
+            for key in stale:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+fragments = FragmentCache()
+
+
+def cached_fragment(*vary: str, cache: FragmentCache = fragments):
+    """Caches the output of a slot, per slot name and vary keys.
+    Without vary keys, a single fragment is shared by all requests.
+    """
+    unknown = set(vary) - set(VARY)
+    if unknown:
+        raise KeyError(f"Unknown vary keys: {', '.join(sorted(unknown))}.")
+
+    def decorator(slot):
+        @wraps(slot)
+        def cached_slot(request, name, view):
+            key = (name, tuple((vkey, VARY[vkey](request)) for vkey in vary))
+            if (fragment := cache.get(key)) is None:
+                fragment = slot(request, name, view)
+                cache.set(key, fragment)
+            return fragment
+        return cached_slot
+    return decorator
+
+
+@events.subscribe(ObjectModifiedEvent)
+def user_modified(event):
+    if isinstance(event.obj, contenttypes.registry["user"].factory):
+        fragments.invalidate(user=event.obj["uid"])
@@ -1,10 +1,16 @@
+import gzip
 from horseman.response import Response, reply
 from uvcreha.app import browser
-from uvcreha.jsonschema import store
-from functools import wraps
-from typing import Iterable
+from uvcreha.jsonschema import store, split_version
+from functools import wraps, lru_cache
+from typing import Dict, Iterable, NamedTuple, Optional
 from horseman.http import HTTPCode
 
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
 
 def allow_origins(origins: str, codes: Iterable[HTTPCode] = None):
     def cors_wrapper(method):
@@ -21,10 +27,85 @@ def allow_origins(origins: str, codes: Iterable[HTTPCode] = None):
     return cors_wrapper
 
 
+class Representation(NamedTuple):
+    etag: str
+    body: bytes
+
+
+@lru_cache(maxsize=256)
+def representations(digest: str, document: bytes) -> Dict[str, Representation]:
+    """Precomputed content-codings of a schema document.
+    """
+    encoded = {
+        "identity": Representation(f'"{digest}"', document),
+        "gzip": Representation(
+            f'"{digest}-gzip"', gzip.compress(document, mtime=0)),
+    }
+    if brotli is not None:
+        encoded["br"] = Representation(
+            f'"{digest}-br"', brotli.compress(document))
+    return encoded
+
+
+def preferred_encoding(accept_encoding: Optional[str],
+                       available: Iterable[str]) -> str:
+    """Picks the content-coding with the highest q-value.
+    Brotli is preferred over gzip on equal footing.
+    """
+    if not accept_encoding:
+        return "identity"
+    ranked = []
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if coding in available and coding != "identity":
+            try:
+                q = float(params.strip().partition("=")[2] or 1)
+            except ValueError:
+                continue
+            if q > 0:
+                ranked.append((q, coding == "br", coding))
+    if ranked:
+        return max(ranked)[2]
+    return "identity"
+
+
+def if_none_match(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):  # weak comparison
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
 @browser.register("/jsonschema/{schema}", name="jsonschema")
-@allow_origins("*", [200])
+@allow_origins("*", [200, 304])
 def jsonschema(request, schema: str):
-    structure = store.get(schema)
-    if structure is None:
+    try:
+        snapshot = store.resolve(*split_version(schema))
+    except (KeyError, ValueError):
         return reply(404)
-    return Response.to_json(body=dict(structure))
+
+    encoded = representations(snapshot.hash, snapshot.document)
+    encoding = preferred_encoding(
+        request.environ.get("HTTP_ACCEPT_ENCODING"), encoded)
+    representation = encoded[encoding]
+    headers = {
+        "ETag": representation.etag,
+        "Cache-Control": "public, no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    if if_none_match(
+            request.environ.get("HTTP_IF_NONE_MATCH"), representation.etag):
+        return Response.create(304, headers=headers)
+
+    headers["Content-Type"] = "application/json"
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response.create(200, body=representation.body, headers=headers)
@@ -1,6 +1,7 @@
 from reiter.application.browser import TemplateLoader
 from uvcreha.request import Request
 from uvcreha.browser.resources import siguvtheme
+from uvcreha.browser.fragments import cached_fragment
 from uvcreha.app import ui
 
 
@@ -26,21 +27,25 @@ class Layout:
 
 
 @ui.register_slot(request=Request, name="sitecap")
+@cached_fragment()
 def sitecap(request, name, view):
     return TEMPLATES["sitecap.pt"].render(request=request)
 
 
 @ui.register_slot(request=Request, name="globalmenu")
+@cached_fragment()
 def globalmenu(request, name, view):
     return TEMPLATES["globalmenu.pt"].render(request=request)
 
 
 @ui.register_slot(request=Request, name="navbar")
+@cached_fragment()
 def navbar(request, name, view):
     return TEMPLATES["navbar.pt"].render(request=request)
 
 
 @ui.register_slot(request=Request, name="sidebar")
+@cached_fragment("user")
 def sidebar(request, name, view):
     return TEMPLATES["sidebar.pt"].render(request=request)
 
@@ -56,5 +61,6 @@ def messages(request, name, view):
 
 
 @ui.register_slot(request=Request, name="footer")
+@cached_fragment()
 def footer(request, name, view):
     return TEMPLATES["footer.pt"].render(request=request)
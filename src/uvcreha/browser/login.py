@@ -2,11 +2,11 @@ import horseman.response
 from horseman.http import Multidict
 from reiter.form import trigger
 from uvcreha.app import browser
-from uvcreha.browser.form import Form, FormView
+from uvcreha.browser.form import Form, FormView, schema_fields_for
 from uvcreha.request import Request
 from uvcreha import contenttypes
 from uvcreha.app import events 
-from uvcreha.events import UserLoggedInEvent
+from uvcreha.events import UserLoggedInEvent, ObjectModifiedEvent
 
 
 @browser.register("/login")
@@ -20,8 +20,8 @@ class LoginForm(FormView):
         return self.request.environ["SCRIPT_NAME"] + "/login"
 
     def setupForm(self, data={}, formdata=Multidict()):
-        ct = contenttypes.registry["user"]
-        form = Form.from_schema(ct.schema, include=("loginname", "password"))
+        form = Form(
+            schema_fields_for("User", include=("loginname", "password")))
         form.process(data=data, formdata=formdata)
         return form
 
@@ -57,8 +57,7 @@ class EditPassword(FormView):
     action = "edit_pw"
 
     def setupForm(self, data={}, formdata=Multidict()):
-        ct = contenttypes.registry["user"]
-        form = Form.from_schema(ct.schema, include=("password"))
+        form = Form(schema_fields_for("User", include=("password",)))
         form.process(data=data, formdata=formdata)
         return form
 
@@ -71,6 +70,7 @@ class EditPassword(FormView):
         ct = contenttypes.registry["user"]
         um = request.database.bind(ct)
         um.update(key=request.user.id, **data.form)
+        request.app.notify(ObjectModifiedEvent(request, request.user))
         flash_messages = request.utilities.get("flash")
         flash_messages.add(
             body="Ihr neues Passwort wurde erfolgreich im System gespeichert."
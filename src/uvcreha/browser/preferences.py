@@ -1,8 +1,9 @@
 from horseman.http import Multidict
 from uvcreha.app import browser
 from reiter.form import trigger
-from uvcreha.browser.form import Form, FormView
-from uvcreha import jsonschema, contenttypes
+from uvcreha.browser.form import Form, FormView, schema_fields_for
+from uvcreha import contenttypes
+from uvcreha.events import ObjectModifiedEvent
 
 
 @browser.register("/preferences")
@@ -19,8 +20,7 @@ class EditPreferences(FormView):
     def setupForm(self, data=None, formdata=Multidict()):
         if data is None:
             data = self.request.user.data.get("preferences", {})
-        schema = jsonschema.store.get("UserPreferences")
-        form = Form.from_schema(schema)
+        form = Form(schema_fields_for("UserPreferences"))
         form.process(data=data, formdata=formdata)
         return form
 
@@ -32,4 +32,5 @@ class EditPreferences(FormView):
             return {"form": form}
         user = contenttypes.registry["user"].bind(self.request.database)
         user.update(request.user.key, preferences=data.dict())
+        request.app.notify(ObjectModifiedEvent(request, request.user))
         return self.redirect("/")
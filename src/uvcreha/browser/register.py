@@ -1,17 +1,15 @@
 from uvcreha.browser.crud import AddForm
 from uvcreha import contenttypes
-from uvcreha.browser.form import Form, FormView
+from uvcreha.browser.form import Form, FormView, schema_fields_for
 from uvcreha.workflow import user_workflow
 from uvcreha.app import browser, events
 from uvcreha.browser.layout import TEMPLATES
 from uuid import uuid4
 from urllib.parse import urlencode
 from horseman.http import Multidict
-from jsonschema_wtforms import schema_fields
-from uvcreha import contenttypes, jsonschema
 from wtforms import StringField
 from reiter.form import trigger
-from uvcreha.events import UserRegisteredEvent
+from uvcreha.events import UserRegisteredEvent, ObjectModifiedEvent
 
 
 TEXT = """Vielen Dank für Ihre Registrierung
@@ -29,10 +27,9 @@ class AddUserForm(AddForm):
         self.content_type = contenttypes.registry['user']
 
     def create(self, data):
-        binding = self.content_type.bind(self.request.database)
         data = data.form.dict()
         uid = str(uuid4())
-        obj, response = binding.create(**{
+        obj, response = self.content_type.create(self.request.database, **{
             **self.params,
             **data,
             '_key': uid,
@@ -52,10 +49,9 @@ class AddUserForm(AddForm):
         return obj
 
     def get_form(self):
-        return Form.from_schema(
-            self.content_type.schema,
-            include=("loginname", "password", "email")
-        )
+        return Form(schema_fields_for(
+            "User", include=("loginname", "password", "email")
+        ))
 
 
 @browser.register("/verify_register", name="verify_register")
@@ -67,8 +63,7 @@ class VerifyRegistration(FormView):
         self.content_type = contenttypes.registry['user']
 
     def get_fields(self):
-        schema = jsonschema.store.get('User')
-        return schema_fields(schema, include=("password", "uid"))
+        return schema_fields_for('User', include=("password", "uid"))
 
     def setupForm(self, data={}, formdata=Multidict()):
         data = self.request.query.dict()
@@ -106,4 +101,5 @@ class VerifyRegistration(FormView):
             uid=data['uid'],
             state=user_workflow.states.active.name
         )
+        request.app.notify(ObjectModifiedEvent(request, user))
         return self.redirect(request.environ["SCRIPT_NAME"] + "/")
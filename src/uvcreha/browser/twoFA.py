@@ -1,15 +1,15 @@
-import base64
-import qrcode
 import wtforms
-from io import BytesIO
 
 import horseman.response
 from horseman.http import Multidict
+from horseman.response import Response
 from reiter.form import trigger
 from uvcreha.events import TwoFAEvent
 from uvcreha.app import browser, ui
 from uvcreha.request import Request
+from uvcreha.auth.qrcodes import qrcodes
 from uvcreha.browser.form import FormMeta, FormView
+from uvcreha.browser.jsonschema import if_none_match
 
 
 def user_totp_validator(totp):
@@ -68,19 +68,23 @@ class TwoFA(FormView):
         return {"form": form}
 
 
+@browser.register("/2FA/qrcode.png", name="twoFA.qrcode")
+def qrcode_image(request):
+    image = request.app.utilities.get("qrcodes", qrcodes).get(
+        request.user.OTP_URI)
+    headers = {
+        "ETag": f'"{image.digest}"',
+        # The code holds the user's secret: never in a shared cache.
+        "Cache-Control": "private, max-age=3600",
+    }
+    if if_none_match(request.environ.get("HTTP_IF_NONE_MATCH"),
+                     headers["ETag"]):
+        return Response.create(304, headers=headers)
+    headers["Content-Type"] = "image/png"
+    return Response.create(200, body=image.png, headers=headers)
+
+
 @ui.register_slot(request=Request, name="below-content", view=TwoFA)
 def QRCode(request, name, view):
-    URI = request.user.OTP_URI
-    qr = qrcode.QRCode(
-        version=1,
-        error_correction=qrcode.constants.ERROR_CORRECT_L,
-        box_size=10,
-        border=4,
-    )
-    qr.add_data(URI)
-    qr.make(fit=True)
-    img = qr.make_image(fill="black", back_color="white")
-    buffer = BytesIO()
-    img.save(buffer, format="PNG")
-    img_str = base64.b64encode(buffer.getvalue()).decode("utf-8")
-    return f"""<img src="data:image/png;base64,{img_str}" />"""
+    src = request.route_path("twoFA.qrcode")
+    return f"""<img src="{src}" alt="QR Code" />"""
@@ -1,4 +1,6 @@
-from typing import Any
+import logging
+import fanstatic
+from typing import Any, Iterator, List, NamedTuple, Optional
 from reiter.view.meta import APIView
 from uvcreha.app import browser
 from uvcreha.browser.layout import TEMPLATES
@@ -6,6 +8,90 @@ from uvcreha import contenttypes
 from horseman.response import Response
 
 
+logger = logging.getLogger(__name__)
+
+# Stands for the content in a streamed page, until it is rendered.
+CONTENT_MARKER = "<!--uvcreha:content-->"
+
+# Ends a streamed page whose content failed to render.
+STREAM_ERROR = (
+    '<div class="alert alert-danger">'
+    'Diese Seite konnte nicht vollst\u00e4ndig angezeigt werden.</div>'
+)
+
+
+class DeferredTemplate:
+    """Template standing in for the view template while the layout is
+    rendered: the namespace is kept, the rendering itself is deferred.
+    """
+
+    __slots__ = ("template", "namespace")
+
+    def __init__(self, template):
+        self.template = template
+        self.namespace: Optional[dict] = None
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, **namespace):
+        self.namespace = namespace
+        return CONTENT_MARKER
+
+
+def include_resources(page: str, injector) -> str:
+    """Renders the needed resources in the page with `injector`, the
+    fanstatic injector plugin configured as the middleware's. The
+    middleware then has nothing left to inject, hence doesn't buffer.
+    """
+    needed = fanstatic.get_needed()
+    if not needed.has_resources():
+        return page
+    page = injector(page.encode(), needed).decode()
+    needed.clear()
+    return page
+
+
+def streamed_page(page: str, content: DeferredTemplate) -> Iterator[bytes]:
+    head, _, tail = page.partition(CONTENT_MARKER)
+    yield head.encode()
+    try:
+        body = content.template.render(**content.namespace)
+    except Exception:
+        # The status is sent already: the page can only be cut short.
+        logger.exception("Rendering of a streamed page failed.")
+        yield STREAM_ERROR.encode()
+        return
+    yield body.encode()
+    yield tail.encode()
+
+
+def stream_rendering(view: APIView, ns: dict, layout=...) -> Response:
+    """Renders the layout first, the view template being deferred.
+    The head of the page is sent as soon as it's ready, the content
+    follows once rendered, then the rest of the layout.
+
+    The layout, with its slots, is rendered before the response is
+    returned: what it does to the session and resources is kept.
+    The view template is rendered once the response started, after
+    the session was saved and the resources injected: it must not
+    have side effects. An error in it can only truncate the page.
+    Without an 'injector' utility, the page is not streamed.
+    """
+    injector = view.request.app.utilities.get("injector")
+    if injector is None:
+        return view.request.app.ui.response(
+            view.template, layout=layout, **ns)
+    content = DeferredTemplate(view.template)
+    page = view.request.app.ui.render(content, layout=layout, **ns)
+    if content.namespace is None:  # no layout: nothing to stream.
+        return Response.create(
+            body=page, headers={"Content-Type": "text/html; charset=utf-8"})
+    return Response.create(
+        body=streamed_page(include_resources(page, injector), content),
+        headers={"Content-Type": "text/html; charset=utf-8"})
+
+
 def layout_rendering(view: APIView, result: Any, raw=False, layout=...):
     if isinstance(result, str):
         if raw:
@@ -24,6 +110,8 @@ def layout_rendering(view: APIView, result: Any, raw=False, layout=...):
         if raw:
             return view.request.app.ui.render(
                 view.template, layout=layout, **ns)
+        if getattr(view, "stream", False):
+            return stream_rendering(view, ns, layout=layout)
         return view.request.app.ui.response(
             view.template, layout=layout, **ns)
 
@@ -37,12 +125,36 @@ def layout_rendering(view: APIView, result: Any, raw=False, layout=...):
 
 class View(APIView):
     render = layout_rendering
+    # Streams the page, see `stream_rendering`: only for the views
+    # whose template was checked to have no side effects, such as
+    # needing resources or changing the session or flash messages.
+    stream = False
+
+
+class FileListing(NamedTuple):
+    file: contenttypes.Content
+    documents: List[contenttypes.Content]
+    count: int
+
+
+# Files of a user, with their documents: one database round trip.
+FILES_DOCUMENTS_QUERY = """
+FOR file IN @@files
+  FILTER file.uid == @uid
+  LET documents = (
+    FOR doc IN @@documents
+      FILTER doc.uid == file.uid AND doc.az == file.az
+      RETURN doc
+  )
+  RETURN {file: file, documents: documents}
+"""
 
 
 @browser.register("/")
 class LandingPage(View):
 
     template = TEMPLATES["index.pt"]
+    stream = True
 
     def GET(self):
         user = self.request.user
@@ -51,7 +163,28 @@ class LandingPage(View):
         #self.request.app.utilities['amqp'].send(
         #    {'test': 'YEAH'}, key='object.add'
         #)
-        return {"user": user}
+        return {
+            "user": user,
+            "files": self.get_files_with_documents(user.id)
+        }
+
+    def get_files_with_documents(self, uid) -> List[FileListing]:
+        file_ct = contenttypes.registry["file"]
+        doc_ct = contenttypes.registry["document"]
+        cursor = self.request.database.aql.execute(
+            FILES_DOCUMENTS_QUERY, bind_vars={
+                "@files": file_ct.collection,
+                "@documents": doc_ct.collection,
+                "uid": uid,
+            })
+        return [
+            FileListing(
+                file=file_ct.factory(**row["file"]),
+                documents=[doc_ct.factory(**doc) for doc in row["documents"]],
+                count=len(row["documents"]),
+            )
+            for row in cursor
+        ]
 
     def get_files(self, key):
         ct = contenttypes.registry["file"]
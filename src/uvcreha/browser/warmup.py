@@ -0,0 +1,94 @@
+"""Compilation of the Chameleon templates ahead of the first requests.
+
+The compiled templates are kept in a bytecode cache directory, shared
+by the workers and, once built, across restarts: e.g. in a Docker image,
+
+    uvcreha-templates /var/cache/chameleon
+
+then run the workers with `CHAMELEON_CACHE=/var/cache/chameleon`.
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+from pathlib import Path
+from typing import Iterable, List, NamedTuple, Optional
+from chameleon.loader import ModuleLoader
+from chameleon.template import BaseTemplate
+
+
+TEMPLATES_FOLDER = Path(__file__).parent / "templates"
+
+
+class TemplateTiming(NamedTuple):
+    name: str
+    seconds: float
+
+
+def use_cache_directory(path: Path):
+    """Chameleon only reads `CHAMELEON_CACHE` once, when imported:
+    this sets the cache directory of the templates cooked from now on.
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    BaseTemplate.loader = ModuleLoader(str(path.absolute()))
+
+
+def warmup(templates, folder: Path = TEMPLATES_FOLDER) -> List[TemplateTiming]:
+    """Compiles all the templates of the folder, from their loader.
+    A template found in the cache directory is loaded, not compiled.
+    """
+    timings = []
+    for path in sorted(folder.glob("*.pt")):
+        start = time.perf_counter()
+        templates[path.name].cook_check()
+        timings.append(
+            TemplateTiming(path.name, time.perf_counter() - start))
+    return timings
+
+
+def timing_table(timings: Iterable[TemplateTiming]) -> str:
+    timings = sorted(timings, key=lambda timing: timing.seconds, reverse=True)
+    width = max((len(timing.name) for timing in timings), default=8)
+    lines = [f"{'template':<{width}}  {'ms':>8}"]
+    lines.extend(
+        f"{timing.name:<{width}}  {timing.seconds * 1000:>8.1f}"
+        for timing in timings)
+    total = sum(timing.seconds for timing in timings)
+    lines.append(f"{'total':<{width}}  {total * 1000:>8.1f}")
+    return "\n".join(lines)
+
+
+def templates_warmup(cache: Optional[Path] = None):
+    """Startup loader: compiles the templates before serving.
+    """
+    from uvcreha.browser.layout import TEMPLATES
+
+    if cache is not None:
+        use_cache_directory(cache)
+    timings = warmup(TEMPLATES)
+    logging.info("Templates warm-up:\n" + timing_table(timings))
+    return timings
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Prebuilds the templates bytecode cache.")
+    parser.add_argument(
+        "cache", type=Path, nargs="?",
+        default=os.environ.get("CHAMELEON_CACHE"),
+        help="cache directory, defaults to $CHAMELEON_CACHE")
+    args = parser.parse_args(argv)
+    if args.cache is None:
+        parser.error("no cache directory given.")
+
+    from uvcreha.browser.layout import TEMPLATES
+
+    use_cache_directory(args.cache)
+    print(timing_table(warmup(TEMPLATES)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,19 @@
 import jsonschema_rs
-from typing import Optional, Dict, Any
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Optional, Dict, Any, Iterable, Iterator, List, NamedTuple
+from json_ref_dict import RefDict
 
 import roughrider.contenttypes
 import reiter.arango.meta
 from reiter.arango.binding import Binder
+from uvcreha.jsonschema import store, split_version
+
+
+# Key of the version of their content type schema, recorded by the
+# stored items. The schemas of the stamped content types declare it.
+SCHEMA_VERSION = "schema_version"
 
 
 class Content(reiter.arango.meta.Content, roughrider.contenttypes.Content):
@@ -24,21 +34,132 @@ class Content(reiter.arango.meta.Content, roughrider.contenttypes.Content):
                 yield action, action.resolve(request, self)
 
 
+class ItemErrors(NamedTuple):
+    index: int  # position of the item in the validated batch
+    errors: List[str]
+
+
+def item_errors(validator, items: Iterable) -> Iterator[ItemErrors]:
+    for index, data in items:
+        errors = [
+            "/" + "/".join(map(str, error.instance_path)) +
+            f": {error.message}"
+            for error in validator.iter_errors(data)
+        ]
+        if errors:
+            yield ItemErrors(index=index, errors=errors)
+
+
+def chunked(iterable: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+# Compiled validators can't be pickled: each pool worker compiles its own.
+_worker_validator = None
+
+
+def _init_worker(schema: Dict):
+    global _worker_validator
+    _worker_validator = jsonschema_rs.JSONSchema(schema)
+
+
+def _validate_chunk(chunk: List) -> List[ItemErrors]:
+    return list(item_errors(_worker_validator, chunk))
+
+
 class ContentType(roughrider.contenttypes.ContentType):
 
-    __slots__ = ("factory", "schema", "collection")
+    __slots__ = (
+        "factory", "schema", "collection", "stats",
+        "_validator", "_revision"
+    )
 
     schema: Dict
     collection: Optional[str]
+    stats: Counter
 
     def __init__(self, factory, schema, collection=None):
         self.factory = factory
         self.schema = schema
         self.collection = collection
+        self.stats = Counter(compiled=0, hits=0)
+        self._validator = None
+        self._revision = None
+
+    def resolve_schema(self, version: Optional[int] = None) -> Dict:
+        if isinstance(self.schema, RefDict):
+            # Resolved from the store: the root may have changed.
+            name, _ = split_version(self.schema.uri.root)
+            return store.resolve(
+                name, store.known_version(name, version)).dict()
+        return self.schema
+
+    @property
+    def validator(self) -> jsonschema_rs.JSONSchema:
+        return self.validator_for()
+
+    def validator_for(
+            self, version: Optional[int] = None) -> jsonschema_rs.JSONSchema:
+        """Compiled validator, rebuilt only when the schemas store changed.
+        Stored schemas are versioned: the store keeps a validator per
+        version. Inline schemas are not, `version` is then ignored.
+        """
+        if isinstance(self.schema, RefDict):
+            name, _ = split_version(self.schema.uri.root)
+            validator, compiled = store.cached_validator(
+                name, store.known_version(name, version))
+            self.stats["compiled" if compiled else "hits"] += 1
+            return validator
+        if self._validator is None or self._revision != store.revision:
+            self._revision = store.revision
+            self._validator = jsonschema_rs.JSONSchema(self.resolve_schema())
+            self.stats["compiled"] += 1
+        else:
+            self.stats["hits"] += 1
+        return self._validator
+
+    def stamp_version(self, data: Dict) -> Dict:
+        """Records the schema version in a new item, if it has none:
+        it is then validated against this version, even once the
+        schema has newer ones. Inline schemas are not versioned.
+        """
+        if isinstance(self.schema, RefDict) and \
+           data.get(SCHEMA_VERSION) is None:
+            name, version = split_version(self.schema.uri.root)
+            data[SCHEMA_VERSION] = store.lookup(name, version).number
+        return data
+
+    def create(self, db: Any, **data):
+        """Creates an item, bound to the current schema version.
+        """
+        return self.bind(db).create(**self.stamp_version(data))
 
     def validate(self, data):
-        validator = jsonschema_rs.JSONSchema(self.schema)
-        validator.validate(data)  # may raise jsonschema_rs ValidationError
+        # Data is validated against the schema version it records.
+        # may raise jsonschema_rs ValidationError
+        self.validator_for(data.get(SCHEMA_VERSION)).validate(data)
+
+    def validate_many(self, items: Iterable[Dict],
+                      processes: Optional[int] = None,
+                      chunksize: int = 1000,
+                      version: Optional[int] = None) -> List[ItemErrors]:
+        """Validates a batch of items, without raising.
+        Returns the errors of the invalid items only, in order.
+        Items are dispatched in chunks to a pool of `processes` workers
+        if given, otherwise they are validated in the current process.
+        """
+        items = enumerate(items)
+        if not processes:
+            return list(item_errors(self.validator_for(version), items))
+
+        with ProcessPoolExecutor(
+                processes,
+                initializer=_init_worker,
+                initargs=(self.resolve_schema(version),)) as pool:
+            reports = pool.map(_validate_chunk, chunked(items, chunksize))
+            return [errors for report in reports for errors in report]
 
     def bind(self, db: Any, create: bool = True):
         if self.collection is None:
@@ -1,6 +1,11 @@
+import copy
+import time
 import smtplib
 import functools
-from typing import NamedTuple
+import threading
+from collections import deque
+from typing import (
+    Callable, Deque, Iterable, Iterator, NamedTuple, Optional, Tuple)
 from contextlib import contextmanager
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
@@ -12,18 +17,99 @@ class SMTPConfiguration(NamedTuple):
     emitter: str
     port: int = 25
     host: str = "localhost"
+    pool_size: int = 4  # maximum number of open connections
+    idle_timeout: float = 60  # seconds before an idle connection is closed
+    timeout: float = 30  # socket timeout, in seconds
+
+
+def close_session(server: smtplib.SMTP):
+    try:
+        server.quit()
+    except (smtplib.SMTPException, OSError):
+        server.close()
+
+
+class SMTPPool:
+    """Bounded pool of established SMTP sessions.
+    Idle sessions are checked with a NOOP before being reused and
+    closed when they have been idle for more than `idle_timeout`.
+    """
+
+    __slots__ = ("connect", "idle_timeout", "_idle", "_slots", "_lock")
+
+    _idle: Deque[Tuple[float, smtplib.SMTP]]  # (last use, session)
+
+    def __init__(self, connect: Callable[[], smtplib.SMTP],
+                 size: int = 4, idle_timeout: float = 60):
+        self.connect = connect
+        self.idle_timeout = idle_timeout
+        self._idle = deque()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._idle)
+
+    def _reusable(self) -> Optional[smtplib.SMTP]:
+        now = time.monotonic()
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                last_used, server = self._idle.pop()  # most recent first
+            if now - last_used > self.idle_timeout:
+                close_session(server)
+                continue
+            try:
+                if server.noop()[0] == 250:
+                    return server
+            except (smtplib.SMTPException, OSError):
+                pass
+            server.close()
+
+    def acquire(self) -> smtplib.SMTP:
+        self._slots.acquire()
+        try:
+            if (server := self._reusable()) is None:
+                server = self.connect()
+        except BaseException:
+            self._slots.release()
+            raise
+        return server
+
+    def release(self, server: smtplib.SMTP, reusable: bool = True):
+        try:
+            if reusable:
+                with self._lock:
+                    self._idle.append((time.monotonic(), server))
+            else:
+                server.close()
+        finally:
+            self._slots.release()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, deque()
+        for _, server in idle:
+            close_session(server)
 
 
 class SecureMailer:
 
     config: SMTPConfiguration
     debug: bool
+    pool: SMTPPool
 
-    __slots__ = ("config", "debug")
+    __slots__ = ("config", "debug", "pool")
 
     def __init__(self, **config):
         self.config = SMTPConfiguration(**config)
         self.debug = False
+        self.pool = SMTPPool(
+            self.connect,
+            size=self.config.pool_size,
+            idle_timeout=self.config.idle_timeout
+        )
 
     @staticmethod
     def format_email(_from, _to, subject, text, html=None):
@@ -47,9 +133,25 @@ class SecureMailer:
     def email(self, recipient, subject, text, html=None):
         return self.format_email(self.config.emitter, recipient, subject, text, html)
 
-    @contextmanager
-    def smtp(self):
-        server = smtplib.SMTP(self.config.host, self.config.port)
+    def bulk_email(self, recipients: Iterable[str], subject, text,
+                   html=None) -> Iterator[MIMEMultipart]:
+        """One message per recipient, for a same subject and body.
+        The parts are built and encoded once, in a template: the
+        messages are copies of it, with their own headers only.
+        """
+        template = self.format_email(
+            self.config.emitter, None, subject, text, html)
+        del template["To"]
+        template.as_bytes()  # fixes the multipart boundary, once.
+        for recipient in recipients:
+            msg = copy.copy(template)  # the parts are shared.
+            msg._headers = template._headers.copy()
+            msg["To"] = recipient
+            yield msg
+
+    def connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(
+            self.config.host, self.config.port, timeout=self.config.timeout)
         server.set_debuglevel(self.debug)
 
         # identify ourselves, prompting server for supported features
@@ -61,7 +163,27 @@ class SecureMailer:
             server.ehlo()  # re-identify ourselves over TLS connection
         if self.config.user:
             server.login(self.config.user, self.config.password)
+        return server
+
+    @contextmanager
+    def smtp(self):
+        """Yields a function sending messages through a pooled session.
+        A session dropped by the server is replaced once, transparently.
+        """
+        server = self.pool.acquire()
+
+        def send_message(msg, *args, **kwargs):
+            nonlocal server
+            try:
+                return server.send_message(msg, *args, **kwargs)
+            except (smtplib.SMTPServerDisconnected, ConnectionError):
+                server.close()
+                server = self.connect()
+                return server.send_message(msg, *args, **kwargs)
+
+        reusable = False
         try:
-            yield server.send_message
+            yield send_message
+            reusable = True
         finally:
-            server.close()
+            self.pool.release(server, reusable)
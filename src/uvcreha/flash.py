@@ -9,15 +9,22 @@ class Message(NamedTuple):
 
 
 class SessionMessages:
+    """Flash messages, stored as a list in the session.
+
+    The session is only marked as modified: it is written down once,
+    by the session middleware, when the response starts.
+    """
+
     def __init__(self, session, key="flashmessages"):
         self.key = key
         self.session = session
 
     def __iter__(self):
-        if self.key in self.session:
-            while self.session[self.key]:
-                yield Message(**self.session[self.key].pop(0))
-                self.session.save()
+        # All the messages are drained at once, by removing the list.
+        if messages := self.session.get(self.key):
+            del self.session[self.key]
+            for message in messages:
+                yield Message(**message)
 
     def add(self, body: str, type: str = "info"):
         if self.key in self.session:
@@ -25,7 +32,7 @@ class SessionMessages:
         else:
             messages = self.session[self.key] = []
         messages.append({"type": type, "body": body})
-        self.session.save()
+        self.session.save()  # mark as modified, for an in-place change.
 
 
 @events.subscribe(reiter.application.events.RequestCreated)
@@ -1,10 +1,20 @@
+import os
 import orjson
 import logging
-from typing import Dict, Any, Optional, NoReturn, NamedTuple
+import jsonschema_rs
+from collections import Counter
+from bisect import bisect_left, bisect_right, insort
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import sha256
+from types import MappingProxyType
+from typing import (
+    Dict, Any, Iterator, List, Optional, NoReturn, NamedTuple, Mapping, Tuple)
 from collections import UserDict
 from pathlib import Path
+from json_ref_dict import materialize
 from json_ref_dict.ref_dict import RefDict
 from json_ref_dict.loader import get_document
+from json_ref_dict.ref_pointer import resolve_uri
 
 
 class Version(NamedTuple):
@@ -13,13 +23,21 @@ class Version(NamedTuple):
 
 
 class VersionedValue:
+    """Values indexed by version number.
+    Version numbers are kept sorted, for an O(1) `latest`,
+    O(log n) lookups of positions and ordered range queries.
+    """
 
-    latest: int
     _store: Dict[int, Any]
+    _versions: List[int]  # sorted
 
     def __init__(self):
         self._store = {}
-        self.latest = 0
+        self._versions = []
+
+    @property
+    def latest(self) -> int:
+        return self._versions[-1] if self._versions else 0
 
     def get(self, version: Optional[int] = None) -> Version:
         if version is not None:
@@ -30,11 +48,19 @@ class VersionedValue:
         return Version(number=version, value=value)
 
     def __iter__(self):
-        for key, value in self._store.items():
-            yield Version(number=key, value=value)
+        for key in self._versions:
+            yield Version(number=key, value=self._store[key])
 
     def keys(self):
-        return self._store.keys()
+        return iter(self._versions)
+
+    def between(self, first: int, last: int) -> Iterator[Version]:
+        """Versions from `first` to `last`, both included, in order.
+        """
+        start = bisect_left(self._versions, int(first))
+        end = bisect_right(self._versions, int(last))
+        for key in self._versions[start:end]:
+            yield Version(number=key, value=self._store[key])
 
     def add(self, value: Any, version: Optional[int] = None) -> int:
         if version is not None:
@@ -47,18 +73,16 @@ class VersionedValue:
             version = self.latest + 1
         self._store[version] = value
         if version > self.latest:
-            self.latest = version
+            self._versions.append(version)
+        else:
+            insort(self._versions, version)
         return version
 
     def remove(self, version: int) -> Any:
         version = int(version)
         if version in self._store:
             value = self._store.pop(version)
-            keys = self._store.keys()
-            if len(keys):
-                self.latest = max(keys)
-            else:
-                self.latest = 0
+            del self._versions[bisect_left(self._versions, version)]
             return Version(number=version, value=value)
         raise KeyError(f'Unknown version: {version}.')
 
@@ -85,6 +109,9 @@ class DocumentItemStore:
     def __contains__(self, name: str):
         return name in self._store
 
+    def __iter__(self):
+        return iter(self._store)
+
     def add(self, name: str, item: Any, version: Optional[int] = None) -> int:
         value = self._store.setdefault(name, VersionedValue())
         return value.add(item, version)
@@ -93,7 +120,10 @@ class DocumentItemStore:
         if version is None:
             del self._store[name]
         else:
-            self._store[name].remove(version)
+            value = self._store[name]
+            value.remove(version)
+            if not value:
+                del self._store[name]  # no version left.
 
     def get(self, name, version: Optional[int] = None) -> Any:
         value = self._store.get(name)
@@ -111,28 +141,126 @@ class DocumentItemStore:
         if v is not None:
             return iter(v)
 
+    def items_between(self, name, first: int, last: int):
+        v = self._store.get(name)
+        if v is not None:
+            return v.between(first, last)
+
+
+def freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def split_version(reference: str) -> Tuple[str, Optional[int]]:
+    """'name@version' to (name, version). Without a version, the
+    reference designates the latest version of the schema.
+    Only a trailing '@<digits>' is a version: other '@', as in the
+    userinfo of an URL, are part of the name.
+    """
+    name, at, version = reference.rpartition("@")
+    if at and version.isdigit():
+        return name, int(version)
+    return reference, None
+
+
+class Snapshot(NamedTuple):
+    """Fully dereferenced, immutable version of a schema.
+    """
+    name: str
+    version: int
+    schema: Mapping  # deeply frozen
+    hash: str  # sha256 hex digest of the document
+    document: bytes  # canonical JSON serialization
+
+    def dict(self) -> Dict[str, Any]:
+        """Mutable copy, for the consumers needing plain structures.
+        """
+        return orjson.loads(self.document)
+
+
+# Keyword of a schema declaring its own version number.
+VERSION = "version"
+
 
 class JSONSchemaStore:
+    """Versioned schemas, addressed as 'name' for the latest version
+    or 'name@version' for a pinned one, including in references.
+
+    The version numbers recorded by the stored documents must outlive
+    the process: schemas declare theirs with the `version` keyword.
+    Undeclared ones are numbered in the order of registration.
+    """
+
     def __init__(self, *managed_urls):
-        self.schemas = {}
+        self.schemas = DocumentItemStore()
+        self.revision = 0  # bumped on each change, for cache invalidation.
+        self.stats = Counter(compiled=0, hits=0)
+        self._snapshots: Dict[Tuple[str, int], Snapshot] = {}
+        self._validators: Dict[Tuple[str, int], jsonschema_rs.JSONSchema] = {}
         self.urls = set((
             url + "/" if not url.endswith("/") else url
             for url in managed_urls
         ))
 
-    def add(self, name: str, schema: dict):
-        print(name)
-        if name in self.schemas:
+    def add(self, name: str, schema: dict,
+            version: Optional[int] = None) -> int:
+        if version is None:
+            version = schema.get(VERSION)
+        if version is None and name in self.schemas:
             raise KeyError(f"Schema {name} already exists.")
-        self.schemas[name] = schema
+        version = self.schemas.add(name, schema, version)
+        self.changed()
+        return version
 
     def items(self):
-        return self.schemas.items()
+        for name in self.schemas:
+            yield name, self.lookup(name).value
 
-    def remove(self, name: str):
+    def versions(self, name: str):
+        return self.schemas.versions_for(name)
+
+    def remove(self, name: str, version: Optional[int] = None):
         if name not in self.schemas:
             raise KeyError(f"Schema {name} does not exist.")
-        del self.schemas[name]
+        self.schemas.remove(name, version)
+        self.changed()
+
+    def changed(self):
+        """Invalidates what was computed from the previous schemas.
+        References may now resolve differently: json_ref_dict's own
+        documents cache is cleared as well.
+        """
+        self.revision += 1
+        self._snapshots.clear()
+        self._validators.clear()
+        resolve_uri.cache_clear()
+
+    def lookup(self, name: str, version: Optional[int] = None) -> Version:
+        try:
+            found = self.schemas.get(name, version)
+        except KeyError:
+            raise KeyError(f"Schema {name} has no version {version}.")
+        if found is None:
+            raise KeyError(f"Schema {name} does not exist.")
+        if isinstance(found.value, SchemaFile):
+            return Version(number=found.number, value=found.value.load())
+        return found
+
+    def known_version(self, name: str,
+                      version: Optional[int]) -> Optional[int]:
+        """The version if the store has it, else None for the latest.
+        Documents may record a version that is gone, e.g. removed or
+        undeclared and renumbered since: they fall back on the latest.
+        """
+        if version is None or version in (self.versions(name) or ()):
+            return version
+        logging.warning(
+            f"Schema {name} has no version {version}: using the latest.")
+        return None
 
     def fetch(self, name: str) -> Dict[str, Any]:
         if self.urls:
@@ -140,25 +268,179 @@ class JSONSchemaStore:
                 if name.startswith(url):
                     # We manage this url, if the schema is not here,
                     # we should get a hard fail.
-                    return self.schemas[name[len(url) :]]
+                    return self.lookup(*split_version(name[len(url):])).value
 
+        name, version = split_version(name)
         if name in self.schemas:
-            return self.schemas.get(name)
+            return self.lookup(name, version).value
         return ...
 
-    def get(self, name) -> RefDict:
+    def get(self, name, version: Optional[int] = None) -> RefDict:
+        if version is not None:
+            return RefDict(f"{name}@{version}")
         return RefDict(name)
 
-    def load_from_folder(self, path: Path):
-        for f in path.iterdir():
-            if f.suffix == '.json':
-                with f.open('r') as fd:
-                    schema = orjson.loads(fd.read())
-                    if not '$comment' in schema:
-                        schema['$comment'] = "document item"
-                    key = schema.get('id', f.name)
-                    store.add(key, schema)
-                    logging.info(f'loading {key} : {str(f.absolute())}.')
+    def resolve(self, name: str, version: Optional[int] = None) -> Snapshot:
+        """Resolved snapshot of a schema version, computed once per
+        revision. References are resolved on first use, rather than on
+        `add`, as they can point to schemas that are registered later on.
+        """
+        number = self.lookup(name, version).number
+        if (snapshot := self._snapshots.get((name, number))) is None:
+            resolved = materialize(RefDict(f"{name}@{number}"))
+            document = orjson.dumps(resolved, option=orjson.OPT_SORT_KEYS)
+            snapshot = self._snapshots[name, number] = Snapshot(
+                name=name,
+                version=number,
+                schema=freeze(resolved),
+                hash=sha256(document).hexdigest(),
+                document=document
+            )
+        return snapshot
+
+    def validator(self, name: str,
+                  version: Optional[int] = None) -> jsonschema_rs.JSONSchema:
+        """Compiled validator of a schema version, kept until the store
+        changes: validating old documents costs a lookup, not a compilation.
+        """
+        return self.cached_validator(name, version)[0]
+
+    def cached_validator(
+            self, name: str, version: Optional[int] = None
+    ) -> Tuple[jsonschema_rs.JSONSchema, bool]:
+        """The validator, and whether it was compiled by this call.
+        """
+        number = self.lookup(name, version).number
+        if (validator := self._validators.get((name, number))) is None:
+            validator = self._validators[name, number] = (
+                jsonschema_rs.JSONSchema(self.resolve(name, number).dict()))
+            self.stats["compiled"] += 1
+            return validator, True
+        self.stats["hits"] += 1
+        return validator, False
+
+    def load_from_folder(self, path: Path, index: Optional[Path] = None,
+                         workers: Optional[int] = None) -> int:
+        """Registers the '.json' schemas of the folder.
+        Files are tracked in an index, by default in the user's cache
+        directory: the folder itself is often read-only, once installed.
+        Only the new or modified files are read, in parallel, and parsed
+        if their content changed: the other ones are parsed on first use.
+        Returns the number of registered schemas.
+        """
+        path = Path(path)
+        index = default_index(path) if index is None else Path(index)
+        known = read_index(index)
+        entries, parsed, changed = {}, {}, []
+        for f in sorted(path.iterdir()):
+            if f.suffix != '.json':
+                continue
+            stat = f.stat()
+            entry = known.get(f.name)
+            if entry is not None and 'version' in entry \
+               and entry['mtime'] == stat.st_mtime_ns \
+               and entry['size'] == stat.st_size:
+                entries[f.name] = entry
+            else:
+                changed.append(f)
+
+        if changed:
+            with ThreadPoolExecutor(workers) as pool:
+                scans = pool.map(
+                    lambda f: scan_schema(f, known.get(f.name)), changed)
+                for f, (entry, schema) in zip(changed, scans):
+                    entries[f.name] = entry
+                    if schema is not None:
+                        parsed[f.name] = schema
+
+        for filename, entry in entries.items():
+            key, version = entry['key'], entry['version']
+            if key in self.schemas and (
+                    version is None or version in self.versions(key)):
+                raise KeyError(f"Schema {key} already exists.")
+            self.schemas.add(
+                key, SchemaFile(path / filename, parsed.get(filename)),
+                version)
+            logging.info(f'loading {key} : {str(path / filename)}.')
+        self.changed()
+
+        if entries != known:
+            write_index(index, entries)
+        return len(entries)
+
+
+def default_index(folder: Path) -> Path:
+    """Index of a schemas folder, in $XDG_CACHE_HOME, one per folder.
+    """
+    cache = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    digest = sha256(str(Path(folder).resolve()).encode()).hexdigest()
+    return Path(cache) / 'uvcreha' / 'schemas' / f'{digest[:16]}.index'
+
+
+class SchemaFile:
+    """Schema of a folder, parsed on first use.
+    """
+
+    __slots__ = ('path', '_schema')
+
+    def __init__(self, path: Path, schema: Optional[Dict] = None):
+        self.path = path
+        self._schema = schema
+
+    def load(self) -> Dict[str, Any]:
+        if self._schema is None:
+            self._schema = parse_schema(self.path.read_bytes())
+        return self._schema
+
+
+def parse_schema(data: bytes) -> Dict[str, Any]:
+    schema = orjson.loads(data)
+    if not '$comment' in schema:
+        schema['$comment'] = "document item"
+    return schema
+
+
+def scan_schema(
+        path: Path, entry: Optional[Dict]) -> Tuple[Dict, Optional[Dict]]:
+    """Index entry of the file, and its schema if it had to be parsed:
+    an unchanged content keeps its indexed key and version, unparsed.
+    """
+    stat = path.stat()
+    data = path.read_bytes()
+    digest = sha256(data).hexdigest()
+    if entry is not None and entry['hash'] == digest and 'version' in entry:
+        schema = None
+        key, version = entry['key'], entry['version']
+    else:
+        schema = parse_schema(data)
+        key, version = schema.get('id', path.name), schema.get(VERSION)
+    return {
+        'mtime': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'hash': digest,
+        'key': key,
+        'version': version,
+    }, schema
+
+
+def read_index(index: Path) -> Dict[str, Dict]:
+    try:
+        return orjson.loads(index.read_bytes())
+    except FileNotFoundError:
+        return {}
+    except orjson.JSONDecodeError:
+        logging.warning(f'Ignoring the corrupted schemas index {index}.')
+        return {}
+
+
+def write_index(index: Path, entries: Dict[str, Dict]):
+    tmp = index.with_name(index.name + '.tmp')
+    try:
+        index.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_bytes(orjson.dumps(entries, option=orjson.OPT_SORT_KEYS))
+        tmp.replace(index)
+    except OSError as exc:
+        logging.warning(f'Could not write the schemas index {index}: {exc}')
 
 
 store: JSONSchemaStore = JSONSchemaStore()
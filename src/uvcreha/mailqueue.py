@@ -0,0 +1,232 @@
+"""Outbound mails, spooled and delivered in the background.
+
+The requests only enqueue: a worker thread delivers the spooled mails
+in batches, each batch through one SMTP session of the mailer.
+Failed deliveries are retried with an exponential backoff.
+"""
+
+import time
+import email
+import logging
+import smtplib
+import sqlite3
+import threading
+from collections import Counter, deque
+from contextlib import contextmanager
+from email.message import Message
+from pathlib import Path
+from typing import Iterator, List, NamedTuple, Optional
+
+
+logger = logging.getLogger(__name__)
+
+# Errors concerning a message, not the SMTP session.
+MAIL_ERRORS = (
+    smtplib.SMTPRecipientsRefused,
+    smtplib.SMTPSenderRefused,
+    smtplib.SMTPDataError,
+)
+
+
+class SpooledMail(NamedTuple):
+    id: int
+    message: bytes
+    attempts: int
+
+
+class MailSpool:
+    """Durable spool of the mails to send, in a SQLite database.
+    """
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS mails ("
+        "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+        "message BLOB NOT NULL, "
+        "attempts INTEGER NOT NULL DEFAULT 0, "
+        "next_attempt REAL NOT NULL, "
+        "failed INTEGER NOT NULL DEFAULT 0, "
+        "error TEXT)",
+        "CREATE INDEX IF NOT EXISTS mails_due "
+        "ON mails (failed, next_attempt)",
+    )
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()  # one connection per thread.
+        for statement in self.SCHEMA:
+            self.connection.execute(statement)
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(
+                str(self.path), timeout=10, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def __len__(self):
+        """Number of mails waiting to be sent."""
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM mails WHERE failed = 0").fetchone()[0]
+
+    def put(self, message: Message) -> int:
+        return self.connection.execute(
+            "INSERT INTO mails (message, next_attempt) VALUES (?, ?)",
+            (message.as_bytes(), time.time())
+        ).lastrowid
+
+    def due(self, limit: int, now: Optional[float] = None) -> List[SpooledMail]:
+        rows = self.connection.execute(
+            "SELECT id, message, attempts FROM mails "
+            "WHERE failed = 0 AND next_attempt <= ? "
+            "ORDER BY next_attempt, id LIMIT ?",
+            (time.time() if now is None else now, limit))
+        return [SpooledMail(*row) for row in rows]
+
+    def failed(self) -> Iterator[SpooledMail]:
+        rows = self.connection.execute(
+            "SELECT id, message, attempts FROM mails WHERE failed = 1")
+        for row in rows:
+            yield SpooledMail(*row)
+
+    def done(self, id: int):
+        self.connection.execute("DELETE FROM mails WHERE id = ?", (id,))
+
+    def retry(self, id: int, next_attempt: float, error: str):
+        self.connection.execute(
+            "UPDATE mails SET attempts = attempts + 1, next_attempt = ?, "
+            "error = ? WHERE id = ?", (next_attempt, error, id))
+
+    def give_up(self, id: int, error: str):
+        self.connection.execute(
+            "UPDATE mails SET attempts = attempts + 1, failed = 1, "
+            "error = ? WHERE id = ?", (error, id))
+
+
+class MailQueue:
+    """Background delivery of the spooled mails, through `mailer`.
+    It can stand in for the mailer: `smtp()` yields a function that
+    enqueues the messages rather than sending them.
+    """
+
+    def __init__(self, mailer, spool: MailSpool,
+                 batch_size: int = 50,
+                 interval: float = 5,
+                 max_attempts: int = 8,
+                 backoff: float = 30,
+                 max_backoff: float = 3600):
+        self.mailer = mailer
+        self.spool = spool
+        self.batch_size = batch_size
+        self.interval = interval  # seconds between two spool polls.
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.stats = Counter(
+            enqueued=0, sent=0, retried=0, failed=0, batches=0)
+        self._lock = threading.Lock()  # the stats are shared by threads.
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+    def _count(self, key: str, number: int = 1):
+        with self._lock:
+            self.stats[key] += number
+
+    def email(self, *args, **kwargs) -> Message:
+        return self.mailer.email(*args, **kwargs)
+
+    def enqueue(self, message: Message) -> int:
+        id = self.spool.put(message)
+        self._count("enqueued")
+        self._wakeup.set()
+        return id
+
+    @contextmanager
+    def smtp(self):
+        yield self.enqueue
+
+    def delay(self, attempts: int) -> float:
+        """Seconds to wait before the next attempt."""
+        return min(self.max_backoff, self.backoff * 2 ** (attempts - 1))
+
+    def _failure(self, mail: SpooledMail, error: Exception, now: float):
+        attempts = mail.attempts + 1
+        if attempts >= self.max_attempts:
+            self.spool.give_up(mail.id, repr(error))
+            self._count("failed")
+            logger.error(
+                f"Giving up mail {mail.id} after {attempts} attempts: "
+                f"{error!r}")
+        else:
+            self.spool.retry(mail.id, now + self.delay(attempts), repr(error))
+            self._count("retried")
+
+    def run_once(self, now: Optional[float] = None) -> int:
+        """Delivers a batch of due mails. Returns the number sent.
+        """
+        now = time.time() if now is None else now
+        pending = deque(self.spool.due(self.batch_size, now))
+        if not pending:
+            return 0
+        self._count("batches")
+        sent = 0
+        try:
+            with self.mailer.smtp() as send:
+                while pending:
+                    mail = pending[0]
+                    try:
+                        send(email.message_from_bytes(mail.message))
+                    except MAIL_ERRORS as exc:
+                        self._failure(mail, exc, now)  # this mail only.
+                    else:
+                        self.spool.done(mail.id)
+                        sent += 1
+                    pending.popleft()
+        except Exception as exc:
+            # No session or a broken one: the rest of the batch waits.
+            logger.warning(f"Mail delivery interrupted: {exc!r}")
+            for mail in pending:
+                self._failure(mail, exc, now)
+        self._count("sent", sent)
+        return sent
+
+    def _drain(self):
+        # Each batch is taken at the current time: the mails enqueued
+        # during the previous one are due as well.
+        while self.run_once(time.time()) == self.batch_size:
+            pass  # more mails are due.
+
+    def run(self):
+        """Worker loop. Once stopped, it delivers what is due one last time.
+        """
+        while not self._stopping.is_set():
+            self._wakeup.clear()
+            try:
+                self._drain()
+            except Exception:
+                logger.exception("Mail queue worker error.")
+            self._wakeup.wait(self.interval)
+        try:
+            self._drain()
+        except Exception:
+            logger.exception("Mail queue worker error.")
+
+    def start(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._stopping.clear()
+            self._worker = threading.Thread(
+                target=self.run, name="mailqueue", daemon=True)
+            self._worker.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stopping.set()
+        self._wakeup.set()
+        if self._worker is not None:
+            self._worker.join(timeout)
+            if not self._worker.is_alive():
+                self._worker = None
@@ -1,15 +1,78 @@
+import copy
+import time
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from reiter.events.meta import Subscribers
 from uvcreha.app import events
 from uvcreha import contenttypes
 import uvcreha.events
-from typing import Dict
+from typing import Any, Dict, Mapping, NamedTuple, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+class ChannelMetrics:
+    """Deliveries of a channel and their latency, in seconds.
+    """
+
+    __slots__ = ("count", "errors", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def record(self, seconds: float, failed: bool = False):
+        self.count += 1
+        self.errors += failed
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+
+class DetachedRequest(NamedTuple):
+    """What the background deliveries get of the request: by the time
+    they run, the request may be over.
+    """
+    app: Any
+    utilities: Mapping
+
+
+def detached(event: uvcreha.events.UserEvent) -> uvcreha.events.UserEvent:
+    """Copy of the event for the workers, without the request and with
+    its own copy of the user. The namespace holds the rendered message.
+    """
+    request = DetachedRequest(
+        app=event.request.app, utilities=event.request.app.utilities)
+    return event.__class__(
+        request, copy.deepcopy(event.user), **event.namespace)
 
 
 class UserMessageCenter:
+    """Redistributes the user events to the subscribers of each
+    channel the user chose in the `messaging_type` preference.
+
+    The channels are notified inline, unless `start` was called:
+    they are then notified concurrently, in a pool of workers, with
+    a detached copy of the event. At most `max_pending` deliveries
+    wait or run at once. Beyond that, the notifying thread waits for
+    up to `timeout` seconds, then delivers inline.
+    """
 
     def __init__(self):
         self._subscribers: Dict[str, Subscribers] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Optional[threading.BoundedSemaphore] = None
+        self._lock = threading.Lock()
+        self.timeout: float = 1
+        self.overflows = 0  # deliveries made inline, the pool being full.
+        self.metrics: Dict[str, ChannelMetrics] = {}
 
     def subscribe(self, name, event_type):
         def register_subscriber(func):
@@ -21,16 +84,86 @@ class UserMessageCenter:
             return func
         return register_subscriber
 
-    def dispatch(self, event):
+    def dispatch(self, event) -> Tuple[str, ...]:
         if isinstance(event, uvcreha.events.UserEvent):
             if preferences := event.user.get('preferences'):
-                return preferences.get('messaging_type', 'email')
-            return 'email'
+                channels = preferences.get('messaging_type') or 'email'
+                if isinstance(channels, str):
+                    return (channels,)
+                return tuple(dict.fromkeys(channels))  # ordered, unique.
+            return ('email',)
+        return ()
+
+    def deliver(self, channel: str, event):
+        start = time.perf_counter()
+        failed = False
+        try:
+            self._subscribers[channel].notify(event)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                if (metrics := self.metrics.get(channel)) is None:
+                    metrics = self.metrics[channel] = ChannelMetrics()
+                metrics.record(elapsed, failed)
+
+    def _logged_delivery(self, channel: str, event):
+        # Once started, failed deliveries don't fail the requests.
+        try:
+            self.deliver(channel, event)
+        except Exception:
+            logger.exception(f"Delivery on the {channel!r} channel failed.")
+
+    def _background_delivery(self, channel: str, event):
+        try:
+            self._logged_delivery(channel, event)
+        finally:
+            self._pending.release()
 
     def __call__(self, event):
-        key = self.dispatch(event)
-        if key is not None and key in self._subscribers:
-            self._subscribers[key].notify(event)
+        channels = [
+            key for key in self.dispatch(event) if key in self._subscribers]
+        executor = self._executor
+        if executor is None:
+            for channel in channels:
+                self.deliver(channel, event)
+            return
+
+        background = detached(event)
+        for channel in channels:
+            if not self._pending.acquire(timeout=self.timeout):
+                with self._lock:
+                    self.overflows += 1
+                logger.warning(
+                    f"Message center is full: {channel!r} delivered inline.")
+                self._logged_delivery(channel, event)
+                continue
+            try:
+                executor.submit(
+                    self._background_delivery, channel, background)
+            except RuntimeError:
+                # Stopped meanwhile: back to inline deliveries.
+                self._pending.release()
+                self._logged_delivery(channel, event)
+
+    def start(self, workers: int = 4, max_pending: int = 64,
+              timeout: float = 1):
+        if self._executor is not None:
+            raise RuntimeError("The message center is already started.")
+        self.timeout = timeout
+        self._pending = threading.BoundedSemaphore(max_pending)
+        self._executor = ThreadPoolExecutor(
+            workers, thread_name_prefix="messaging")
+
+    def stop(self, wait: bool = True):
+        """Back to inline deliveries. The pending ones are completed
+        if `wait` is true.
+        """
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
 
 
 message_center = UserMessageCenter()
@@ -3,10 +3,16 @@ from uvcreha.jsonschema import store
 from uvcreha.contenttypes import registry, Content
 
 
+# Key of the version of the item's content type schema, in a document.
+# The document's own schema version is under `SCHEMA_VERSION`.
+ITEM_SCHEMA_VERSION = "item_schema_version"
+
+
 store.add(
     "Document",
     {
         "id": "Document",
+        "version": 1,
         "title": "Document",
         "type": "object",
         "properties": {
@@ -31,6 +37,22 @@ store.add(
                 "format": "date-time",
             },
             "state": {"title": "State", "type": "string"},
+            "schema_version": {
+                "title": "Schema version",
+                "description": (
+                    "Version of the Document schema the document was "
+                    "created with. The latest one, if missing."
+                ),
+                "type": "integer",
+            },
+            "item_schema_version": {
+                "title": "Item schema version",
+                "description": (
+                    "Version of the content type schema the item was "
+                    "created with. The latest one, if missing."
+                ),
+                "type": "integer",
+            },
             "content_type": {
                 "title": "Dokumentart",
                 "description": "Bitte w\u00e4hlen Sie eine Dokumentart",
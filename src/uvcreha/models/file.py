@@ -5,6 +5,7 @@ from uvcreha.contenttypes import registry, Content
 
 file_schema = {
     "id": "File",
+    "version": 1,
     "title": "File",
     "type": "object",
     "properties": {
@@ -34,6 +35,14 @@ file_schema = {
             "format": "date-time",
         },
         "state": {"title": "State", "default": "created", "type": "string"},
+        "schema_version": {
+            "title": "Schema version",
+            "description": (
+                "Version of the File schema the file was "
+                "created with. The latest one, if missing."
+            ),
+            "type": "integer",
+        },
         "unternehmen": {"$ref": "Unternehmen#/"},
         "versichertenfall": {"$ref": "VersichertenFall#/"},
     },
@@ -1,6 +1,7 @@
 import pyotp
 import base64
 import hashlib
+from functools import lru_cache
 from uvcreha.workflow import user_workflow
 from uvcreha.jsonschema import store
 from uvcreha.contenttypes import registry, Content
@@ -10,6 +11,7 @@ store.add(
     "UserPreferences",
     {
         "id": "UserPreferences",
+        "version": 1,
         "title": "User preferences",
         "description": "User-based application preferences",
         "type": "object",
@@ -82,10 +84,19 @@ store.add(
     "User",
     {
         "id": "User",
+        "version": 1,
         "title": "User model",
         "type": "object",
         "properties": {
             "uid": {"title": "ID", "description": "Internal User ID", "type": "string"},
+            "schema_version": {
+                "title": "Schema version",
+                "description": (
+                    "Version of the User schema the user was "
+                    "created with. The latest one, if missing."
+                ),
+                "type": "integer",
+            },
             "loginname": {
                 "title": "Loginname",
                 "description": "Bitte tragen Sie hier den Loginnamen ein.",
@@ -123,6 +134,21 @@ store.add(
 )
 
 
+@lru_cache(maxsize=1024)
+def shared_key(uid: str, loginname: str) -> bytes:
+    key = hashlib.sha256(uid.encode("utf-8"))
+    key.update(loginname.encode("utf-8"))
+    return base64.b32encode(key.digest())
+
+
+@lru_cache(maxsize=1024)
+def user_totp(uid: str, loginname: str, **params) -> pyotp.TOTP:
+    """TOTP objects are stateless: they are shared by the requests.
+    Keyed by uid and loginname, as is the shared key.
+    """
+    return pyotp.TOTP(shared_key(uid, loginname), name=loginname, **params)
+
+
 @registry.factory("user", schema=store.get("User"), collection="users")
 class User(Content):
     @property
@@ -140,18 +166,13 @@ class User(Content):
 
     @property
     def shared_key(self) -> bytes:
-        key = hashlib.sha256(self["uid"].encode("utf-8"))
-        key.update(self["loginname"].encode("utf-8"))
-        return base64.b32encode(key.digest())
+        return shared_key(self["uid"], self["loginname"])
 
     @property
-    def TOTP(self) -> bytes:
+    def TOTP(self) -> pyotp.TOTP:
         """We use mostly default values for Google Authenticator compat.
         """
-        return pyotp.TOTP(
-            self.shared_key,
-            name=self["loginname"],
-        )
+        return user_totp(self["uid"], self["loginname"])
 
     @property
     def OTP_URI(self) -> str:
@@ -159,9 +180,9 @@ class User(Content):
 
     def generate_token(
             self, digits=8, digest=hashlib.sha256, interval=60*60):  # 1h
-        return pyotp.TOTP(
-            self.shared_key,
-            name=self["loginname"],
+        return user_totp(
+            self["uid"],
+            self["loginname"],
             digits=digits,
             digest=digest,
             interval=interval
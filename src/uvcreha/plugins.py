@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Dict, List, Optional
 from horseman.types import WSGICallable
 
 
@@ -13,18 +14,37 @@ def flash_messages(session_key):
 
 
 def session_middleware(
-    cache: Path, cookie_secret, cookie_name, environ_key
+    cookie_secret, cookie_name, environ_key,
+    cache: Optional[Path] = None, store=None
 ) -> WSGICallable:
+    """The session store is given by `store`, if provided.
+    It defaults to a file store, in the `cache` folder.
+    See `uvcreha.sessions` for other stores.
+    """
     import cromlech.session
-    import cromlech.sessions.file
 
-    handler = cromlech.sessions.file.FileStore(cache, 3000)
+    if store is not None:
+        handler = store
+    else:
+        import cromlech.sessions.file
+        handler = cromlech.sessions.file.FileStore(cache, 3000)
     manager = cromlech.session.SignedCookieManager(
         cookie_secret, handler, cookie=cookie_name
     )
     return cromlech.session.WSGISessionManager(manager, environ_key=environ_key)
 
 
+def resources_injector(**options):
+    """The fanstatic injector plugin, for the streamed pages to render
+    their resources as the middleware would. Takes the injector options
+    of the middleware: `bottom`, `force_bottom`, `compile`, `bundle`,
+    `rollup`, `debug` or `minified`.
+    """
+    from fanstatic.injector import TopBottomInjector
+
+    return TopBottomInjector(dict(options))
+
+
 def webpush_plugin(private_key: Path, public_key: Path, vapid_claims: dict):
     from uvcreha.webpush import Webpush
 
@@ -35,3 +55,48 @@ def webpush_plugin(private_key: Path, public_key: Path, vapid_claims: dict):
         pubkey = fd.read().strip("\n")
 
     return Webpush(private_key=privkey, public_key=pubkey, claims=vapid_claims)
+
+
+def mail_queue(mailer, spool: Path, **options):
+    """Mails sent through the returned queue are spooled in `spool`,
+    a SQLite database, and delivered by a background worker.
+    The queue can be used as the 'emailer' utility.
+    """
+    from uvcreha.mailqueue import MailQueue, MailSpool
+
+    queue = MailQueue(mailer, MailSpool(spool), **options)
+    queue.start()
+    return queue
+
+
+def messaging_workers(workers: int = 4, max_pending: int = 64,
+                      timeout: float = 1):
+    """Startup loader: the user messages are delivered by a pool of
+    workers, rather than on the request thread. For production
+    configurations, in the `loaders` list:
+
+      - !name:uvcreha.plugins.messaging_workers
+        workers: 4
+        max_pending: 64
+
+    The message center is process-wide: without this loader, as in the
+    tests, the messages are delivered inline.
+    """
+    from uvcreha.messaging import message_center
+
+    message_center.start(
+        workers=workers, max_pending=max_pending, timeout=timeout)
+    return message_center
+
+
+def arango_indexes(connector, indexes: Dict[str, List[List[str]]]):
+    """Ensures the persistent indexes exist, creating the collections
+    if needed. Existing identical indexes are left untouched.
+    """
+    db = connector.get_database()
+    for collection, fieldsets in indexes.items():
+        if not db.has_collection(collection):
+            db.create_collection(collection)
+        for fields in fieldsets:
+            db.collection(collection).add_persistent_index(
+                fields=list(fields), sparse=True)
@@ -1,14 +1,61 @@
+from collections import Counter
+from typing import Any, Dict, Hashable, Optional, Tuple
 from horseman.http import Query
 from reiter.application.request import Request as BaseRequest
 
 
+class IdentityMap:
+    """Request-scoped registry of the loaded contents.
+    Repeated lookups of a same content return the already loaded object.
+    """
+
+    __slots__ = ("request", "contents", "stats")
+
+    contents: Dict[Tuple[str, Hashable], Any]
+    stats: Counter
+
+    def __init__(self, request):
+        self.request = request
+        self.contents = {}
+        self.stats = Counter(hits=0, misses=0)
+
+    def _lookup(self, key: Tuple[str, Hashable]) -> Optional[Any]:
+        if (content := self.contents.get(key)) is not None:
+            self.stats["hits"] += 1
+        else:
+            self.stats["misses"] += 1
+        return content
+
+    def _register(self, collection: str, content: Any):
+        if content is not None and "_key" in content:
+            self.contents[(collection, content["_key"])] = content
+
+    def fetch(self, content_type, key: str):
+        if (content := self._lookup((content_type.collection, key))) is None:
+            binding = content_type.bind(self.request.database)
+            content = binding.fetch(key)
+            self._register(content_type.collection, content)
+        return content
+
+    def find_one(self, content_type, **filters):
+        key = (content_type.collection, frozenset(filters.items()))
+        if (content := self._lookup(key)) is None:
+            binding = content_type.bind(self.request.database)
+            content = binding.find_one(**filters)
+            if content is not None:
+                self.contents[key] = content
+                self._register(content_type.collection, content)
+        return content
+
+
 class Request(BaseRequest):
 
-    __slots__ = ("query", "_db")
+    __slots__ = ("query", "_db", "_contents")
 
     def __init__(self, app, environ, route):
         super().__init__(app, environ, route)
         self._db = None
+        self._contents = None
         self.query = Query.from_environ(environ)
 
     @property
@@ -21,3 +68,10 @@ class Request(BaseRequest):
         if self._db is None:
             self._db = self.app.utilities["arango"].get_database()
         return self._db
+
+    @property
+    def contents(self) -> IdentityMap:
+        """Lazy identity map of the contents loaded during the request."""
+        if self._contents is None:
+            self._contents = IdentityMap(self)
+        return self._contents
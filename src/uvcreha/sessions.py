@@ -0,0 +1,160 @@
+"""Session stores, as alternatives to `cromlech.sessions.file.FileStore`.
+"""
+
+import time
+import pickle
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, NamedTuple, Tuple
+from cromlech.session import Store
+
+
+class Shard(NamedTuple):
+    lock: threading.Lock
+    sessions: Dict[str, Tuple[float, bytes]]  # sid: (expires, data)
+
+
+class MemoryStore(Store):
+    """In-process sessions, sharded by sid to limit lock contention.
+    Session data is pickled, to avoid mutability by reference.
+    Expired sessions are swept every `sweep_interval` seconds.
+    """
+
+    def __init__(self, delta: int, shards: int = 16,
+                 sweep_interval: float = 60):
+        self.delta = delta  # lifespan delta in seconds.
+        self.shards = tuple(
+            Shard(lock=threading.Lock(), sessions={}) for _ in range(shards))
+        self.sweep_interval = sweep_interval
+        self._next_sweep = time.time() + sweep_interval
+
+    def shard(self, sid: str) -> Shard:
+        return self.shards[hash(sid) % len(self.shards)]
+
+    def __iter__(self) -> Iterator[str]:
+        for shard in self.shards:
+            with shard.lock:
+                sids = list(shard.sessions)
+            yield from sids
+
+    def get(self, sid: str) -> dict:
+        shard = self.shard(sid)
+        with shard.lock:
+            entry = shard.sessions.get(sid)
+            if entry is None:
+                return self.new()
+            expires, data = entry
+            if expires < time.time():
+                del shard.sessions[sid]
+                return self.new()
+        return pickle.loads(data)
+
+    def set(self, sid: str, session: dict):
+        assert isinstance(session, dict)
+        data = pickle.dumps(session, protocol=pickle.HIGHEST_PROTOCOL)
+        now = time.time()
+        shard = self.shard(sid)
+        with shard.lock:
+            shard.sessions[sid] = (now + self.delta, data)
+        if now > self._next_sweep:
+            self.flush_expired_sessions()
+
+    def touch(self, sid: str):
+        shard = self.shard(sid)
+        with shard.lock:
+            if (entry := shard.sessions.get(sid)) is not None:
+                shard.sessions[sid] = (time.time() + self.delta, entry[1])
+
+    def clear(self, sid: str):
+        shard = self.shard(sid)
+        with shard.lock:
+            shard.sessions.pop(sid, None)
+
+    delete = clear
+
+    def flush_expired_sessions(self):
+        now = time.time()
+        self._next_sweep = now + self.sweep_interval
+        for shard in self.shards:
+            with shard.lock:
+                expired = [
+                    sid for sid, (expires, _) in shard.sessions.items()
+                    if expires < now
+                ]
+                for sid in expired:
+                    del shard.sessions[sid]
+
+
+class SQLiteStore(Store):
+    """Sessions in a single SQLite database, in WAL mode.
+    The database can be shared by the workers of a same node.
+    Expired sessions are swept every `sweep_interval` seconds.
+    """
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS sessions ("
+        "sid TEXT PRIMARY KEY, data BLOB NOT NULL, expires REAL NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS sessions_expires ON sessions (expires)",
+    )
+
+    def __init__(self, path: Path, delta: int, sweep_interval: float = 60):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.delta = delta  # lifespan delta in seconds.
+        self.sweep_interval = sweep_interval
+        self._next_sweep = time.time() + sweep_interval
+        self._local = threading.local()  # one connection per thread.
+        for statement in self.SCHEMA:
+            self.connection.execute(statement)
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(
+                str(self.path), timeout=10, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def __iter__(self) -> Iterator[str]:
+        cursor = self.connection.execute("SELECT sid FROM sessions")
+        for (sid,) in cursor:
+            yield sid
+
+    def get(self, sid: str) -> dict:
+        row = self.connection.execute(
+            "SELECT data FROM sessions WHERE sid = ? AND expires >= ?",
+            (sid, time.time())
+        ).fetchone()
+        if row is None:
+            return self.new()
+        return pickle.loads(row[0])
+
+    def set(self, sid: str, session: dict):
+        assert isinstance(session, dict)
+        data = pickle.dumps(session, protocol=pickle.HIGHEST_PROTOCOL)
+        now = time.time()
+        self.connection.execute(
+            "INSERT OR REPLACE INTO sessions (sid, data, expires) "
+            "VALUES (?, ?, ?)", (sid, data, now + self.delta))
+        if now > self._next_sweep:
+            self.flush_expired_sessions()
+
+    def touch(self, sid: str):
+        self.connection.execute(
+            "UPDATE sessions SET expires = ? WHERE sid = ?",
+            (time.time() + self.delta, sid))
+
+    def clear(self, sid: str):
+        self.connection.execute("DELETE FROM sessions WHERE sid = ?", (sid,))
+
+    delete = clear
+
+    def flush_expired_sessions(self):
+        now = time.time()
+        self._next_sweep = now + self.sweep_interval
+        self.connection.execute(
+            "DELETE FROM sessions WHERE expires < ?", (now,))
@@ -1,24 +1,123 @@
 import json
-from datetime import datetime, timedelta
-from typing import NamedTuple, Optional
-from pywebpush import webpush, WebPushException
+import time
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+from urllib.parse import urlparse
+from py_vapid import Vapid
+from pywebpush import WebPusher, WebPushException
 
 
-class Webpush(NamedTuple):
-    claims: dict
-    private_key: str
-    public_key: str
+# The push service forgot the subscription: it should be removed.
+GONE = frozenset((404, 410))
 
-    def send(self, token: str, message: str) -> Optional[str]:
-        info = json.loads(token)
-        ts = datetime.timestamp(datetime.now() + timedelta(hours=1))
-        claims = {**self.claims, "exp": ts}
+
+class PushResult(NamedTuple):
+    token: Union[str, dict]
+    status: Optional[int]  # None if the push service was not reached.
+    error: Optional[str] = None
+    dead: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class Webpush:
+    """Web push notifications, signed with our VAPID key.
+    The VAPID headers are signed once per push service origin and
+    renewed before they expire. HTTP connections are pooled per origin.
+    """
+
+    __slots__ = (
+        "claims", "private_key", "public_key", "workers", "timeout", "ttl",
+        "expiry", "_vapid", "_signed", "_sessions", "_lock"
+    )
+
+    _signed: Dict[str, Tuple[float, Dict[str, str]]]  # origin: (exp, headers)
+    _sessions: Dict[str, requests.Session]
+
+    def __init__(self, claims: dict, private_key: str, public_key: str,
+                 workers: int = 8, timeout: float = 10, ttl: int = 0,
+                 expiry: int = 12 * 60 * 60):
+        self.claims = claims
+        self.private_key = private_key
+        self.public_key = public_key
+        self.workers = workers
+        self.timeout = timeout
+        self.ttl = ttl
+        self.expiry = expiry  # lifespan of the VAPID signature, in seconds.
+        self._vapid = None
+        self._signed = {}
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def vapid_headers(self, origin: str) -> Dict[str, str]:
+        now = time.time()
+        with self._lock:
+            signed = self._signed.get(origin)
+            # Renewed when less than a tenth of its lifespan is left.
+            if signed is None or signed[0] - self.expiry / 10 < now:
+                if self._vapid is None:
+                    self._vapid = Vapid.from_string(private_key=self.private_key)
+                exp = int(now + self.expiry)
+                headers = self._vapid.sign(
+                    {**self.claims, "aud": origin, "exp": exp})
+                signed = self._signed[origin] = (exp, headers)
+            return signed[1]
+
+    def session(self, origin: str) -> requests.Session:
+        with self._lock:
+            if (session := self._sessions.get(origin)) is None:
+                session = self._sessions[origin] = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(
+                    pool_maxsize=self.workers)
+                session.mount(origin, adapter)
+            return session
+
+    def push(self, token: Union[str, dict], message: str) -> PushResult:
+        try:
+            info = json.loads(token) if isinstance(token, str) else token
+            url = urlparse(info["endpoint"])
+            origin = f"{url.scheme}://{url.netloc}"
+            pusher = WebPusher(info, requests_session=self.session(origin))
+        except (ValueError, KeyError, TypeError, WebPushException) as exc:
+            # Malformed subscription: it can't ever be used.
+            return PushResult(token, None, f"Invalid subscription: {exc}", True)
         try:
-            webpush(
-                subscription_info=info,
-                data=message,
-                vapid_private_key=self.private_key,
-                vapid_claims=claims,
+            response = pusher.send(
+                message,
+                headers=dict(self.vapid_headers(origin)),
+                ttl=self.ttl,
+                timeout=self.timeout,
             )
-        except WebPushException as e:
-            return str(e)
+        except (requests.RequestException, WebPushException) as exc:
+            return PushResult(token, None, str(exc))
+        if response.status_code > 202:
+            return PushResult(
+                token, response.status_code,
+                f"Push failed: {response.status_code} {response.reason}",
+                response.status_code in GONE)
+        return PushResult(token, response.status_code)
+
+    def send_many(self, tokens: Iterable[Union[str, dict]],
+                  message: str) -> List[PushResult]:
+        """Sends the message to all the subscriptions, concurrently.
+        Results are in the order of the tokens. The subscriptions
+        flagged as `dead` should be removed.
+        """
+        tokens = list(tokens)
+        if len(tokens) < 2:
+            return [self.push(token, message) for token in tokens]
+        with ThreadPoolExecutor(min(self.workers, len(tokens))) as pool:
+            return list(pool.map(lambda token: self.push(token, message), tokens))
+
+    def send(self, token: str, message: str) -> Optional[str]:
+        return self.push(token, message).error
+
+    def close(self):
+        with self._lock:
+            sessions, self._sessions = self._sessions, {}
+        for session in sessions.values():
+            session.close()
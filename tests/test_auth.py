@@ -22,3 +22,60 @@ def test_add_user_ok(webapp, user):
     resp = user.login(browser)
     assert resp.status == "302 Found"
     assert resp.request.environ['test.principal'] is not None
+
+
+def test_identity_cache(monkeypatch):
+    from uvcreha.auth import cache
+
+    identities = cache.IdentityCache(maxsize=2, ttl=60)
+    assert identities.get("1") is None
+
+    identities.set("1", {"uid": "1"})
+    identities.set("2", {"uid": "2"})
+    assert identities.get("1") == {"uid": "1"}
+
+    # Each lookup gets its own copy.
+    identities.get("1")["uid"] = "changed"
+    assert identities.get("1") == {"uid": "1"}
+
+    # "2" is the least recently used.
+    identities.set("3", {"uid": "3"})
+    assert len(identities) == 2
+    assert identities.get("2") is None
+
+    # Invalidation applies to all the living caches.
+    cache.invalidate_user("1")
+    assert identities.get("1") is None
+    assert identities.get("3") == {"uid": "3"}
+
+    # Expired entries are dropped.
+    now = cache.time.monotonic()
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now + 61)
+    assert identities.get("3") is None
+    assert len(identities) == 0
+
+
+def test_compiled_filters():
+    from uvcreha.auth import Auth
+    from uvcreha.auth.filters import security_bypass
+
+    def secured(environ, caller, user):
+        return None
+
+    def twoFA(environ, caller, user):
+        return None
+
+    twoFA.bypass = frozenset(("/2FA",))
+    twoFA.bypass_prefixes = ("/2FA/",)
+
+    bypass = security_bypass(["/login"], prefixes=["/static/"])
+    auth = Auth(None, "user", "session",
+                filters=[bypass, secured, twoFA])
+    dispatch = auth.compile_filters()
+
+    assert dispatch("/login") == ()
+    assert dispatch("/static/uvcreha/main.css") == ()
+    assert dispatch("/2FA") == (bypass, secured)
+    assert dispatch("/2FA/qrcode.png") == (bypass, secured)
+    assert dispatch("/") == (bypass, secured, twoFA)
+    assert dispatch("/users/123") == (bypass, secured, twoFA)
@@ -59,6 +59,99 @@ class TestContentType:
         with pytest.raises(ValidationError):
             ct.validate({"age": "20"})
 
+    def test_validator_cache(self):
+        from uvcreha.jsonschema import store
+
+        ct = ContentType(Person, schema)
+        assert ct.stats == {"compiled": 0, "hits": 0}
+
+        ct.validate({"name": "John"})
+        ct.validate({"name": "Jane"})
+        assert ct.stats == {"compiled": 1, "hits": 1}
+
+        validator = ct.validator
+        assert validator is ct.validator
+        assert ct.stats == {"compiled": 1, "hits": 3}
+
+        # Any change in the schemas store invalidates the validator.
+        store.add("PersonCacheTest", schema)
+        store.remove("PersonCacheTest")
+        assert ct.validator is not validator
+        assert ct.stats == {"compiled": 2, "hits": 3}
+
+    def test_validator_follows_references(self):
+        from jsonschema_rs import ValidationError
+        from uvcreha.jsonschema import store
+
+        store.add("AgeRefTest", {"type": "integer", "minimum": 0})
+        store.add("PersonRefTest", {
+            "type": "object",
+            "properties": {"age": {"$ref": "AgeRefTest"}}
+        })
+        try:
+            ct = ContentType(Person, store.get("PersonRefTest"))
+            ct.validate({"age": 20})
+            ct.validate({"age": 30})
+            assert ct.stats == {"compiled": 1, "hits": 1}
+
+            # The referenced schema changed: the resolved documents
+            # must not be served from a stale cache.
+            store.add("AgeRefTest", {"type": "integer", "minimum": 21},
+                      version=2)
+            with pytest.raises(ValidationError):
+                ct.validate({"age": 20})
+            assert ct.stats == {"compiled": 2, "hits": 1}
+        finally:
+            store.remove("PersonRefTest")
+            store.remove("AgeRefTest")
+
+    def test_pinned_schema_version(self):
+        from jsonschema_rs import ValidationError
+        from uvcreha.contenttypes import SCHEMA_VERSION
+        from uvcreha.jsonschema import store
+
+        store.add("PersonVersionTest", schema)
+        try:
+            ct = ContentType(Person, store.get("PersonVersionTest"))
+            document = ct.stamp_version({"name": "John"})
+            assert document[SCHEMA_VERSION] == 1
+
+            # The schema evolves: the document keeps its version.
+            store.add("PersonVersionTest", {
+                **schema, "required": ["name", "age"]}, version=2)
+            assert ct.stamp_version(document)[SCHEMA_VERSION] == 1
+            ct.validate(document)
+
+            with pytest.raises(ValidationError):
+                ct.validate({"name": "Jane"})
+            ct.validate(ct.stamp_version({"name": "Jane", "age": 26}))
+
+            # An unknown version falls back on the latest one.
+            ct.validate({"name": "Jane", "age": 26, SCHEMA_VERSION: 9})
+            with pytest.raises(ValidationError):
+                ct.validate({"name": "Jane", SCHEMA_VERSION: 9})
+        finally:
+            store.remove("PersonVersionTest")
+
+    def test_validate_many(self):
+        from uvcreha.contenttypes import ItemErrors
+
+        ct = ContentType(Person, schema)
+        items = [
+            {"name": "John"},
+            {"name": "Jane", "age": -1},
+            {"age": "20"},
+            {"name": "Duncan", "age": 26},
+        ]
+        errors = ct.validate_many(items)
+        assert [e.index for e in errors] == [1, 2]
+        assert isinstance(errors[0], ItemErrors)
+        assert errors[0].errors == ["/age: -1 is less than the minimum of 0"]
+        assert len(errors[1].errors) == 2
+
+        assert ct.validate_many(items, processes=2, chunksize=1) == errors
+        assert ct.validate_many([]) == []
+
     def test_no_collection_bind(self, arangodb):
         db = arangodb.get_database()
         ct = ContentType(Person, schema)
@@ -137,3 +137,35 @@ def test_document_item_store():
 
     version = items.get('name')
     assert version.value == 'john'
+
+    # Removing the last version removes the name.
+    items.remove('name', version=2)
+    assert 'name' not in items
+    assert items.get('name') is None
+    assert items.add('name', 'jane') == 1
+
+
+def test_versions_order():
+    vv = VersionedValue()
+    for version in (5, 2, 9, 7, 3):
+        vv.add(f'v{version}', version)
+
+    assert vv.latest == 9
+    assert list(vv.keys()) == [2, 3, 5, 7, 9]
+    assert [v.number for v in vv] == [2, 3, 5, 7, 9]
+    assert list(vv.between(3, 7)) == [(3, 'v3'), (5, 'v5'), (7, 'v7')]
+    assert list(vv.between(4, 6)) == [(5, 'v5')]
+    assert list(vv.between(10, 20)) == []
+
+    assert vv.add('v10') == 10
+    vv.remove(10)
+    vv.remove(9)
+    assert vv.latest == 7
+    vv.remove(3)
+    assert list(vv.keys()) == [2, 5, 7]
+
+    items = DocumentItemStore()
+    assert items.items_between('unknown', 1, 2) is None
+    items.add('name', 'jane')
+    items.add('name', 'john')
+    assert list(items.items_between('name', 2, 5)) == [(2, 'john')]
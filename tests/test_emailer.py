@@ -1,3 +1,5 @@
+import pytest
+import smtplib
 from uvcreha.emailer import SecureMailer
 from email.mime.multipart import MIMEMultipart
 
@@ -14,3 +16,121 @@ def test_emailer():
 
     mail = mailer.email("ck@novareto.de", "SUBJECT", "TEXT")
     assert isinstance(mail, MIMEMultipart)
+
+
+class FakeSMTP:
+
+    instances = []
+
+    def __init__(self, host, port, timeout=None):
+        self.calls = ["connect"]
+        self.alive = True
+        self.disconnect_on_send = False
+        self.sent = []
+        FakeSMTP.instances.append(self)
+
+    def set_debuglevel(self, level):
+        pass
+
+    def ehlo(self):
+        self.calls.append("ehlo")
+
+    def has_extn(self, name):
+        return name == "STARTTLS"
+
+    def starttls(self):
+        self.calls.append("starttls")
+
+    def login(self, user, password):
+        self.calls.append("login")
+
+    def noop(self):
+        if not self.alive:
+            raise smtplib.SMTPServerDisconnected()
+        return (250, b"OK")
+
+    def send_message(self, msg):
+        if self.disconnect_on_send:
+            raise smtplib.SMTPServerDisconnected()
+        self.sent.append(msg)
+
+    def quit(self):
+        self.calls.append("quit")
+
+    def close(self):
+        self.calls.append("close")
+
+
+@pytest.fixture
+def fake_smtp(monkeypatch):
+    FakeSMTP.instances = []
+    monkeypatch.setattr(smtplib, "SMTP", FakeSMTP)
+    return FakeSMTP.instances
+
+
+def test_pooled_sessions(fake_smtp):
+    mailer = SecureMailer(
+        user="user", password="secret", emitter="web@web.de", pool_size=2)
+
+    for recipient in ("a@web.de", "b@web.de", "c@web.de"):
+        with mailer.smtp() as send:
+            send(mailer.email(recipient, "SUBJECT", "TEXT"))
+
+    assert len(fake_smtp) == 1  # one session for all the messages.
+    server = fake_smtp[0]
+    assert len(server.sent) == 3
+    assert server.calls == ["connect", "ehlo", "starttls", "ehlo", "login"]
+
+    # Dead idle sessions are replaced.
+    server.alive = False
+    with mailer.smtp() as send:
+        send(mailer.email("d@web.de", "SUBJECT", "TEXT"))
+    assert len(fake_smtp) == 2
+    assert server.calls[-1] == "close"
+
+    # So are the sessions dropped while sending.
+    fake_smtp[1].disconnect_on_send = True
+    with mailer.smtp() as send:
+        send(mailer.email("e@web.de", "SUBJECT", "TEXT"))
+    assert len(fake_smtp) == 3
+    assert len(fake_smtp[2].sent) == 1
+    assert len(mailer.pool) == 1
+
+    # An error in the block discards the session.
+    with pytest.raises(ValueError):
+        with mailer.smtp() as send:
+            raise ValueError()
+    assert len(mailer.pool) == 0
+
+    mailer.pool.close()
+
+
+def test_idle_timeout(fake_smtp):
+    mailer = SecureMailer(
+        user="", password="", emitter="web@web.de", idle_timeout=0)
+    with mailer.smtp():
+        pass
+    with mailer.smtp():
+        pass
+    assert len(fake_smtp) == 2
+    assert fake_smtp[0].calls[-1] == "quit"
+    assert "login" not in fake_smtp[0].calls
+
+
+def test_bulk_email():
+    mailer = SecureMailer(user="", password="", emitter="web@web.de")
+    recipients = ["a@web.de", "b@web.de"]
+    mails = list(mailer.bulk_email(recipients, "SUBJECT", "TEXT", "<p>HTML</p>"))
+
+    assert [mail["To"] for mail in mails] == recipients
+    assert all(mail.get_all("To") == [mail["To"]] for mail in mails)
+    assert mails[0].get_payload() is mails[1].get_payload()  # shared parts.
+
+    single = mailer.email("a@web.de", "SUBJECT", "TEXT", "<p>HTML</p>")
+    for mail in mails:
+        assert mail["From"] == single["From"]
+        assert mail["Subject"] == single["Subject"]
+        assert [part.get_payload(decode=True) for part in mail.walk()] == [
+            part.get_payload(decode=True) for part in single.walk()]
+        assert mail.as_bytes().count(
+            mail.get_boundary().encode()) == 4  # header, 2 parts, closing
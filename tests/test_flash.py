@@ -28,3 +28,28 @@ def test_flash(webapp, session):
     #  Grab the Messages a 2'nd times
     flash_messages = [x for x in flash_manager]
     assert len(flash_messages) == 0
+
+
+def test_flash_drain(session):
+    from uvcreha.flash import SessionMessages
+
+    flash_manager = SessionMessages(session)
+    for idx in range(3):
+        flash_manager.add(body=f"Message {idx}", type="warning")
+    assert session.modified is True
+    assert len(session["flashmessages"]) == 3
+
+    # Writing down is left to the session middleware.
+    session.persist()
+    assert session.modified is False
+
+    messages = iter(flash_manager)
+    first = next(messages)
+    assert first.body == "Message 0"
+    assert first.type == "warning"
+
+    # The messages are drained at once.
+    assert "flashmessages" not in session
+    assert session.modified is True
+    assert [m.body for m in messages] == ["Message 1", "Message 2"]
+    assert list(flash_manager) == []
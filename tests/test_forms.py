@@ -0,0 +1,44 @@
+from uvcreha.jsonschema import store
+from uvcreha.browser.form import schema_fields_for
+
+
+schema = {
+    "id": "Pet",
+    "title": "Pet",
+    "type": "object",
+    "properties": {
+        "name": {
+            "type": "string",
+            "description": "The pet's name."
+        },
+        "age": {
+            "description": "Age in years.",
+            "type": "integer",
+            "minimum": 0
+        }
+    },
+    "required": ["name"]
+}
+
+
+def test_schema_fields_cache():
+    store.add("Pet", schema)
+    try:
+        fields = schema_fields_for("Pet")
+        assert set(fields) == {"name", "age"}
+        assert schema_fields_for("Pet") == fields
+
+        # A copy is returned, the cached fields are not altered.
+        del fields["age"]
+        assert set(schema_fields_for("Pet")) == {"name", "age"}
+        assert set(schema_fields_for("Pet", include=["name"])) == {"name"}
+        assert set(schema_fields_for("Pet", exclude=["name"])) == {"age"}
+    finally:
+        store.remove("Pet")
+
+    # Changes in the store discard the generated fields.
+    store.add("Pet", schema)
+    try:
+        assert schema_fields_for("Pet")["name"] is not fields["name"]
+    finally:
+        store.remove("Pet")
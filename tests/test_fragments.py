@@ -0,0 +1,54 @@
+import pytest
+from uvcreha.browser.fragments import FragmentCache, cached_fragment
+
+
+class FakeRequest:
+
+    def __init__(self, user=None, language="de"):
+        self.user = user
+        self.environ = {"HTTP_ACCEPT_LANGUAGE": f"{language},en;q=0.5"}
+
+
+def test_cached_fragment(monkeypatch):
+    cache = FragmentCache(maxsize=2)
+    rendered = []
+
+    @cached_fragment(cache=cache)
+    def footer(request, name, view):
+        rendered.append(name)
+        return "<footer />"
+
+    @cached_fragment("user", "language", cache=cache)
+    def sidebar(request, name, view):
+        rendered.append(name)
+        return f"<nav>{request.user['uid']}</nav>"
+
+    john = {"uid": "john"}
+    assert footer(FakeRequest(), "footer", None) == "<footer />"
+    assert footer(FakeRequest(john), "footer", None) == "<footer />"
+    assert rendered == ["footer"]
+
+    assert sidebar(FakeRequest(john), "sidebar", None) == "<nav>john</nav>"
+    assert sidebar(FakeRequest(john), "sidebar", None) == "<nav>john</nav>"
+    assert sidebar(FakeRequest(john, "en"), "sidebar", None)
+    assert rendered == ["footer", "sidebar", "sidebar"]
+    assert len(cache) == 2  # bounded: the footer was evicted.
+    assert cache.stats == {"hits": 2, "misses": 3}
+
+    cache.invalidate(user="jane")
+    assert len(cache) == 2
+    cache.invalidate("sidebar", user="john", language="en")
+    assert len(cache) == 1
+    cache.invalidate(user="john")
+    assert len(cache) == 0
+
+    # Expired fragments are rendered again.
+    from uvcreha.browser import fragments
+    assert footer(FakeRequest(), "footer", None) == "<footer />"
+    now = fragments.time.monotonic()
+    monkeypatch.setattr(fragments.time, "monotonic", lambda: now + 31)
+    assert footer(FakeRequest(), "footer", None) == "<footer />"
+    assert rendered.count("footer") == 3
+
+    with pytest.raises(KeyError):
+        cached_fragment("unknown")
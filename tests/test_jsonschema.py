@@ -0,0 +1,202 @@
+import pytest
+from types import MappingProxyType
+from uvcreha.jsonschema import store
+
+
+def test_resolved_snapshot():
+    store.add("Address", {
+        "type": "object",
+        "properties": {"city": {"type": "string"}}
+    })
+    store.add("Company", {
+        "type": "object",
+        "properties": {
+            "name": {"type": "string"},
+            "address": {"$ref": "Address#/"},
+            "tags": {"type": "array", "items": {"$ref": "#/definitions/Tag"}}
+        },
+        "definitions": {"Tag": {"type": "string"}}
+    })
+    try:
+        snapshot = store.resolve("Company")
+        assert snapshot.name == "Company"
+        assert store.resolve("Company") is snapshot
+
+        # References are resolved and the structure is frozen.
+        assert isinstance(snapshot.schema, MappingProxyType)
+        properties = snapshot.schema["properties"]
+        assert properties["address"]["properties"]["city"] == {
+            "type": "string"}
+        assert properties["tags"]["items"] == {"type": "string"}
+        with pytest.raises(TypeError):
+            snapshot.schema["title"] = "Company"
+
+        # A mutable copy is available.
+        copy = snapshot.dict()
+        assert copy["properties"]["address"] == {
+            "type": "object",
+            "properties": {"city": {"type": "string"}}
+        }
+        copy["title"] = "Company"
+        assert "title" not in snapshot.schema
+
+        # Changes in the store invalidate the snapshots.
+        store.remove("Address")
+        store.add("Address", {"type": "string"})
+        updated = store.resolve("Company")
+        assert updated.hash != snapshot.hash
+        assert updated.schema["properties"]["address"] == {"type": "string"}
+    finally:
+        store.remove("Company")
+        store.remove("Address")
+
+    with pytest.raises(KeyError):
+        store.resolve("Company")
+
+
+def test_content_negotiation():
+    from uvcreha.browser.jsonschema import (
+        preferred_encoding, if_none_match, representations)
+
+    available = ("identity", "gzip", "br")
+    assert preferred_encoding(None, available) == "identity"
+    assert preferred_encoding("gzip, deflate", available) == "gzip"
+    assert preferred_encoding("gzip, deflate, br", available) == "br"
+    assert preferred_encoding("br;q=0.5, gzip", available) == "gzip"
+    assert preferred_encoding("br;q=0, gzip;q=0", available) == "identity"
+    assert preferred_encoding("br", ("identity", "gzip")) == "identity"
+
+    assert if_none_match(None, '"abc"') is False
+    assert if_none_match('"abc"', '"abc"') is True
+    assert if_none_match('W/"abc"', '"abc"') is True
+    assert if_none_match('"xyz", "abc-gzip"', '"abc-gzip"') is True
+    assert if_none_match('"xyz"', '"abc"') is False
+    assert if_none_match('*', '"abc"') is True
+
+    import gzip
+    encoded = representations("abc", b'{"type": "object"}')
+    assert encoded is representations("abc", b'{"type": "object"}')
+    assert encoded["identity"].etag == '"abc"'
+    assert encoded["gzip"].etag == '"abc-gzip"'
+    assert gzip.decompress(encoded["gzip"].body) == b'{"type": "object"}'
+
+
+def test_versioned_schemas():
+    from uvcreha.jsonschema import split_version
+
+    assert split_version("Pet") == ("Pet", None)
+    assert split_version("Pet@2") == ("Pet", 2)
+    assert split_version("https://user@example.com/s.json") == (
+        "https://user@example.com/s.json", None)
+    assert split_version("https://user@example.com/s.json@3") == (
+        "https://user@example.com/s.json", 3)
+    assert store.fetch("https://user@example.com/s.json") is ...
+
+    assert store.add("Pet", {"type": "object", "required": ["name"]}) == 1
+    with pytest.raises(KeyError):
+        store.add("Pet", {"type": "object"})
+    assert store.add("Pet", {
+        "type": "object", "required": ["name", "species"]}, version=2) == 2
+    store.add("Owner", {
+        "type": "object",
+        "properties": {"old": {"$ref": "Pet@1"}, "new": {"$ref": "Pet"}}
+    })
+    try:
+        assert list(store.versions("Pet")) == [1, 2]
+        assert store.resolve("Pet").version == 2
+        assert store.resolve("Pet", 1).schema["required"] == ("name",)
+        assert store.resolve("Pet", 1).hash != store.resolve("Pet").hash
+        owner = store.resolve("Owner").schema["properties"]
+        assert owner["old"]["required"] == ("name",)
+        assert owner["new"]["required"] == ("name", "species")
+
+        compiled = store.stats["compiled"]
+        validator = store.validator("Pet", 1)
+        assert store.validator("Pet", 1) is validator
+        assert store.validator("Pet") is not validator
+        assert store.validator("Pet") is store.validator("Pet", 2)
+        assert store.stats["compiled"] == compiled + 2
+        validator.validate({"name": "Rex"})
+        assert not store.validator("Pet").is_valid({"name": "Rex"})
+
+        with pytest.raises(KeyError):
+            store.resolve("Pet", 3)
+    finally:
+        store.remove("Owner")
+        store.remove("Pet")
+
+    with pytest.raises(KeyError):
+        store.validator("Pet")
+
+    # Schemas can declare their version: it doesn't depend on the
+    # order of registration, hence survives restarts.
+    assert store.add("Pet", {"type": "object", "version": 4}) == 4
+    assert store.add("Pet", {"type": "object", "version": 2}) == 2
+    assert list(store.versions("Pet")) == [2, 4]
+    assert store.known_version("Pet", 2) == 2
+    assert store.known_version("Pet", 3) is None  # falls back on latest.
+    with pytest.raises(KeyError) as exc:
+        store.lookup("Pet", 3)
+    assert str(exc.value) == "'Schema Pet has no version 3.'"
+    store.remove("Pet")
+
+    # Removing the last version, one by one, frees the name.
+    store.add("Pet", {"type": "object"})
+    store.add("Pet", {"type": "object"}, version=2)
+    store.remove("Pet", 1)
+    store.remove("Pet", 2)
+    assert "Pet" not in dict(store.items())
+    assert store.add("Pet", {"type": "object"}) == 1
+    store.remove("Pet")
+
+
+def test_load_from_folder(tmp_path, monkeypatch):
+    import orjson
+    from uvcreha.jsonschema import JSONSchemaStore, SchemaFile, default_index
+
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+
+    folder = tmp_path / "schemas"
+    folder.mkdir()
+    (folder / "cat.json").write_bytes(orjson.dumps(
+        {"id": "Cat", "type": "object"}))
+    (folder / "dog.json").write_bytes(orjson.dumps({"type": "object"}))
+    (folder / "notes.txt").write_text("ignored")
+
+    schemas = JSONSchemaStore()
+    assert schemas.load_from_folder(folder) == 2
+    # The index is kept out of the folder, in the cache directory.
+    assert not (folder / ".index").exists()
+    assert default_index(folder).parent == tmp_path / "cache/uvcreha/schemas"
+    index = orjson.loads(default_index(folder).read_bytes())
+    assert {entry["key"] for entry in index.values()} == {"Cat", "dog.json"}
+    assert schemas.lookup("Cat").value == {
+        "id": "Cat", "type": "object", "$comment": "document item"}
+
+    # Indexed and unchanged: registered without being parsed.
+    schemas = JSONSchemaStore()
+    assert schemas.load_from_folder(folder) == 2
+    lazy = schemas.schemas.get("Cat").value
+    assert isinstance(lazy, SchemaFile) and lazy._schema is None
+    assert schemas.lookup("Cat").value["type"] == "object"
+    assert lazy._schema is not None
+
+    # Declared versions are indexed: several files can hold
+    # the versions of a schema.
+    (folder / "cat2.json").write_bytes(orjson.dumps(
+        {"id": "Cat", "type": "object", "version": 2}))
+    schemas = JSONSchemaStore()
+    assert schemas.load_from_folder(folder) == 3
+    schemas = JSONSchemaStore()
+    schemas.load_from_folder(folder)
+    assert list(schemas.versions("Cat")) == [1, 2]
+    assert schemas.schemas.get("Cat", 2).value._schema is None
+    (folder / "cat2.json").unlink()
+
+    # Modified: parsed again, under its new key.
+    (folder / "cat.json").write_bytes(orjson.dumps(
+        {"id": "Kitten", "type": "object", "title": "Kitten"}))
+    schemas = JSONSchemaStore()
+    schemas.load_from_folder(folder)
+    assert "Cat" not in schemas.schemas
+    assert schemas.schemas.get("Kitten").value._schema["title"] == "Kitten"
@@ -0,0 +1,111 @@
+import pytest
+import smtplib
+import socket
+from contextlib import contextmanager
+from uvcreha.emailer import SecureMailer
+from uvcreha.mailqueue import MailQueue, MailSpool
+
+
+class FakeMailer:
+
+    def __init__(self):
+        self.sessions = 0
+        self.sent = []
+        self.refused = set()
+        self.down = False
+
+    @contextmanager
+    def smtp(self):
+        if self.down:
+            raise ConnectionRefusedError()
+        self.sessions += 1
+
+        def send(msg):
+            if msg["To"] in self.refused:
+                raise smtplib.SMTPRecipientsRefused({msg["To"]: (550, b"")})
+            self.sent.append(msg["To"])
+
+        yield send
+
+
+def message(recipient):
+    return SecureMailer.format_email("web@web.de", recipient, "Hi", "TEXT")
+
+
+def test_mail_queue(tmp_path):
+    mailer = FakeMailer()
+    queue = MailQueue(
+        mailer, MailSpool(tmp_path / "spool.db"),
+        batch_size=2, max_attempts=2, backoff=10)
+
+    with queue.smtp() as send:
+        for recipient in ("a@web.de", "b@web.de", "c@web.de"):
+            send(message(recipient))
+    assert mailer.sent == []  # only enqueued.
+    assert len(queue.spool) == 3
+
+    assert queue.run_once(now=1e10) == 2  # batched in one session.
+    assert queue.run_once(now=1e10) == 1
+    assert queue.run_once(now=1e10) == 0
+    assert mailer.sent == ["a@web.de", "b@web.de", "c@web.de"]
+    assert mailer.sessions == 2
+    assert len(queue.spool) == 0
+
+    # The server is down: everything is retried, after a backoff.
+    mailer.down = True
+    queue.enqueue(message("d@web.de"))
+    assert queue.run_once(now=1e10) == 0
+    assert len(queue.spool) == 1
+    assert queue.spool.due(10, now=1e10 + 9) == []
+    mailer.down = False
+    assert queue.run_once(now=1e10 + 10) == 1
+
+    # Refused mails are given up on, after `max_attempts`.
+    mailer.refused.add("e@web.de")
+    queue.enqueue(message("e@web.de"))
+    queue.run_once(now=1e10)
+    queue.run_once(now=1e11)
+    assert len(queue.spool) == 0
+    assert [mail.attempts for mail in queue.spool.failed()] == [2]
+    assert queue.stats == {
+        "enqueued": 5, "sent": 4, "retried": 2, "failed": 1, "batches": 6}
+
+
+def test_spool_is_durable(tmp_path):
+    MailSpool(tmp_path / "spool.db").put(message("a@web.de"))
+    spool = MailSpool(tmp_path / "spool.db")
+    assert len(spool) == 1
+
+
+def test_worker_delivery(tmp_path):
+    aiosmtpd = pytest.importorskip("aiosmtpd.controller")
+    from aiosmtpd.handlers import Sink
+
+    class Handler(Sink):
+        received = []
+
+        async def handle_DATA(self, server, session, envelope):
+            self.received.extend(envelope.rcpt_tos)
+            return "250 OK"
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    controller = aiosmtpd.Controller(Handler(), hostname="127.0.0.1", port=port)
+    controller.start()
+    try:
+        mailer = SecureMailer(
+            user="", password="", emitter="web@web.de",
+            host="127.0.0.1", port=port)
+        queue = MailQueue(mailer, MailSpool(tmp_path / "spool.db"))
+        queue.start()
+        queue.enqueue(message("a@web.de"))
+        queue.enqueue(message("b@web.de"))
+        queue.stop(timeout=5)
+        assert queue._worker is None  # joined.
+        assert sorted(Handler.received) == ["a@web.de", "b@web.de"]
+        assert len(queue.spool) == 0
+        mailer.pool.close()
+    finally:
+        controller.stop()
@@ -35,3 +35,20 @@ def test_model_crud(arangodb):
 
     new_user = wrapper.fetch(saved_user.id)
     assert new_user['password'] == "newpw"
+
+
+def test_user_otp():
+    user_type = registry['user']
+    user = user_type.factory(uid="123456", loginname="souheil")
+    same = user_type.factory(uid="123456", loginname="souheil", email="x")
+    renamed = user_type.factory(uid="123456", loginname="trollfot")
+
+    assert user.TOTP is same.TOTP
+    assert user.TOTP is not renamed.TOTP
+    assert user.shared_key == same.shared_key != renamed.shared_key
+    assert user.TOTP.verify(same.TOTP.now())
+
+    token = user.generate_token()
+    assert token is same.generate_token()
+    assert token.digits == 8
+    assert user.generate_token(digits=6) is not token
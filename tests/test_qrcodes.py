@@ -0,0 +1,31 @@
+import stat
+from uvcreha.auth.qrcodes import QRCodes
+
+
+URI = "otpauth://totp/john?secret=JBSWY3DPEHPK3PXP"
+
+
+def test_qrcodes_memory():
+    qrcodes = QRCodes(maxsize=1)
+    image = qrcodes.get(URI)
+    assert image.png.startswith(b"\x89PNG")
+    assert qrcodes.get(URI) is image
+    assert qrcodes.stats == {"hits": 1, "disk": 0, "rendered": 1}
+
+    other = qrcodes.get(URI + "1")
+    assert other.digest != image.digest
+    assert len(qrcodes) == 1  # bounded
+    assert qrcodes.get(URI) is not image
+    assert qrcodes.stats["rendered"] == 3
+
+
+def test_qrcodes_disk(tmp_path):
+    folder = tmp_path / "qrcodes"
+    image = QRCodes(folder=folder).get(URI)
+    path = folder / f"{image.digest}.png"
+    assert path.read_bytes() == image.png
+    assert stat.S_IMODE(path.stat().st_mode) == 0o600
+
+    qrcodes = QRCodes(folder=folder)
+    assert qrcodes.get(URI) == image
+    assert qrcodes.stats == {"hits": 0, "disk": 1, "rendered": 0}
@@ -28,3 +28,43 @@ def test_db(uvcreha, environ):
     assert request._db is db
     assert isinstance(db, StandardDatabase)
     assert db.name == "tests"
+
+
+def test_contents_identity_map(uvcreha, environ):
+    from typing import NamedTuple
+
+    class Binding(NamedTuple):
+        calls: list
+
+        def fetch(self, key):
+            self.calls.append(("fetch", key))
+            return {"_key": key, "docid": key}
+
+        def find_one(self, **filters):
+            self.calls.append(("find_one", filters))
+            return {"_key": filters["docid"], **filters}
+
+    class ContentType(NamedTuple):
+        collection: str
+        binding: Binding
+
+        def bind(self, db):
+            return self.binding
+
+    calls = []
+    ct = ContentType(collection="documents", binding=Binding(calls))
+    request = Request(uvcreha, environ, None)
+    request._db = object()  # no database access is needed.
+    contents = request.contents
+    assert contents is request.contents
+
+    doc = contents.find_one(ct, uid="123", docid="1")
+    assert contents.find_one(ct, docid="1", uid="123") is doc
+    assert contents.fetch(ct, "1") is doc
+    assert calls == [("find_one", {"uid": "123", "docid": "1"})]
+    assert contents.stats == {"hits": 2, "misses": 1}
+
+    other = contents.fetch(ct, "2")
+    assert contents.fetch(ct, "2") is other
+    assert calls[1:] == [("fetch", "2")]
+    assert contents.stats == {"hits": 3, "misses": 2}
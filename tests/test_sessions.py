@@ -0,0 +1,54 @@
+import time
+import pytest
+from uvcreha.sessions import MemoryStore, SQLiteStore
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MemoryStore(delta=300, shards=4)
+    return SQLiteStore(tmp_path / "sessions.db", delta=300)
+
+
+def test_store(store):
+    assert list(store) == []
+    assert store.get("unknown") == {}
+
+    data = {"user": "test", "flashmessages": []}
+    store.set("sid", data)
+    assert list(store) == ["sid"]
+    assert store.get("sid") == data
+
+    # We get a copy, to avoid mutability by reference.
+    session = store.get("sid")
+    session["flashmessages"].append({"type": "info", "body": "Hello"})
+    assert store.get("sid") == data
+
+    store.clear("sid")
+    assert store.get("sid") == {}
+    assert list(store) == []
+
+
+def test_store_expiration(store, monkeypatch):
+    store.set("old", {"user": "old"})
+    store.set("touched", {"user": "touched"})
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 200)
+    store.touch("touched")
+
+    monkeypatch.setattr(time, "time", lambda: now + 400)
+    assert store.get("old") == {}
+    assert store.get("touched") == {"user": "touched"}
+
+    store.flush_expired_sessions()
+    assert list(store) == ["touched"]
+
+
+def test_store_sweeping(store, monkeypatch):
+    store.set("old", {"user": "old"})
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 400)
+    store.set("new", {"user": "new"})
+    assert list(store) == ["new"]
@@ -0,0 +1,38 @@
+from uvcreha.browser.views import (
+    CONTENT_MARKER, STREAM_ERROR, DeferredTemplate, include_resources,
+    streamed_page)
+
+
+class Template:
+
+    macros = {"form_group": None}
+
+    def render(self, **namespace):
+        return f"<p>{namespace['title']}</p>"
+
+
+def test_streamed_page():
+    content = DeferredTemplate(Template())
+    assert content.macros == {"form_group": None}
+    page = f"<html><body>{content.render(title='Files')}</body></html>"
+    assert page == f"<html><body>{CONTENT_MARKER}</body></html>"
+
+    # Without a fanstatic injector, there is nothing to include.
+    assert include_resources(page, None) is page
+
+    chunks = streamed_page(page, content)
+    assert next(chunks) == b"<html><body>"  # sent before the rendering.
+    assert list(chunks) == [b"<p>Files</p>", b"</body></html>"]
+
+
+class BrokenTemplate:
+
+    def render(self, **namespace):
+        raise KeyError("title")
+
+
+def test_streamed_page_error():
+    content = DeferredTemplate(BrokenTemplate())
+    page = f"<html><body>{content.render()}</body></html>"
+    assert list(streamed_page(page, content)) == [
+        b"<html><body>", STREAM_ERROR.encode()]
@@ -0,0 +1,28 @@
+from uvcreha.browser.warmup import TemplateTiming, timing_table, warmup
+
+
+class Template:
+
+    def __init__(self):
+        self.cooked = False
+
+    def cook_check(self):
+        self.cooked = True
+
+
+def test_warmup(tmp_path):
+    (tmp_path / "index.pt").write_text("<div />")
+    (tmp_path / "layout.pt").write_text("<html />")
+    (tmp_path / "notes.txt").write_text("ignored")
+    templates = {"index.pt": Template(), "layout.pt": Template()}
+
+    timings = warmup(templates, tmp_path)
+    assert [timing.name for timing in timings] == ["index.pt", "layout.pt"]
+    assert all(template.cooked for template in templates.values())
+
+    table = timing_table([
+        TemplateTiming("index.pt", 0.0015), TemplateTiming("layout.pt", 0.02)
+    ]).splitlines()
+    assert table[0].split() == ["template", "ms"]
+    assert table[1].split() == ["layout.pt", "20.0"]  # slowest first
+    assert table[-1].split() == ["total", "21.5"]
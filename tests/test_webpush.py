@@ -0,0 +1,76 @@
+import base64
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives import serialization
+from py_vapid import Vapid
+from uvcreha.webpush import Webpush
+
+
+def b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).strip(b"=").decode()
+
+
+class PushService(BaseHTTPRequestHandler):
+
+    received = []
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.received.append(
+            (self.path, self.headers["Authorization"], len(body)))
+        self.send_response(410 if self.path == "/gone" else 201)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def subscription(url):
+    key = ec.generate_private_key(ec.SECP256R1()).public_key()
+    return json.dumps({
+        "endpoint": url,
+        "keys": {
+            "p256dh": b64(key.public_bytes(
+                serialization.Encoding.X962,
+                serialization.PublicFormat.UncompressedPoint)),
+            "auth": b64(os.urandom(16)),
+        }
+    })
+
+
+def test_send_many():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PushService)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    origin = f"http://127.0.0.1:{server.server_port}"
+
+    vapid = Vapid()
+    vapid.generate_keys()
+    private_key = b64(vapid.private_key.private_numbers().private_value.to_bytes(32, "big"))
+    webpush = Webpush(
+        claims={"sub": "mailto:admin@example.com"},
+        private_key=private_key, public_key="", workers=4)
+
+    tokens = [subscription(f"{origin}/sub{n}") for n in range(5)]
+    tokens.append(subscription(f"{origin}/gone"))
+    tokens.append("not a subscription")
+    try:
+        results = webpush.send_many(tokens, "Hello")
+    finally:
+        server.shutdown()
+        webpush.close()
+
+    assert [result.token for result in results] == tokens
+    assert [result.ok for result in results] == [True] * 5 + [False] * 2
+    assert results[5].status == 410 and results[5].dead
+    assert results[6].status is None and results[6].dead
+    assert not any(result.dead for result in results[:5])
+
+    assert len(PushService.received) == 6
+    # Signed once for the origin: all the requests share the header.
+    assert len({auth for _, auth, _ in PushService.received}) == 1
+    assert all(size > 0 for _, _, size in PushService.received)